@@ -0,0 +1,43 @@
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+SQLITE_SCHEMES = {'sqlite'}
+POSTGRES_SCHEMES = {'postgres', 'postgresql', 'pgsql'}
+
+
+def parse_database_url(url, conn_max_age=0, conn_health_checks=False):
+    """
+    Return a settings.DATABASES entry for a sqlite:// or postgres:// URL.
+
+    sqlite:///db.sqlite3 is relative to the working directory and
+    sqlite:////var/db.sqlite3 is absolute. Query parameters are passed
+    on as OPTIONS.
+    """
+    parts = urlsplit(url)
+    options = dict(parse_qsl(parts.query))
+    config = {
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': conn_health_checks,
+    }
+
+    if parts.scheme in SQLITE_SCHEMES:
+        name = unquote(parts.path[1:]) or parts.netloc
+        config.update({
+            'ENGINE': 'oper.sqlite3',
+            'NAME': name,
+        })
+    elif parts.scheme in POSTGRES_SCHEMES:
+        config.update({
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': unquote(parts.path[1:]),
+            'USER': unquote(parts.username or ''),
+            'PASSWORD': unquote(parts.password or ''),
+            'HOST': parts.hostname or '',
+            'PORT': parts.port or '',
+        })
+    else:
+        raise ValueError(f"Unsupported DATABASE_URL scheme '{parts.scheme}'")
+
+    if options:
+        config['OPTIONS'] = options
+    return config
+
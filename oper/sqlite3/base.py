@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+def apply_sqlite_pragmas(connection, pragmas):
+    """
+    Run PRAGMA name = value for every item of the pragmas dict.
+    """
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend that applies settings.SQLITE_PRAGMAS to every new
+    connection and starts transactions with BEGIN IMMEDIATE.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_sqlite_pragmas(connection,
+                             getattr(settings, 'SQLITE_PRAGMAS', {}))
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        # A deferred transaction that reads before it writes fails at once
+        # with "database is locked" in WAL mode if another writer committed
+        # in between, whatever the busy timeout. Taking the write lock up
+        # front makes it wait for the lock instead.
+        self.cursor().execute('BEGIN IMMEDIATE')
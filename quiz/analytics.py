@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, When
+from django.db.models.functions import Greatest
+from quiz.models import Answer, OptionPickCount, Question, ScoreCount
+
+
+def record_picks(quiz_id, added_option_ids=(), removed_option_ids=(),
+                 create_counters=True):
+    """
+    Count newly answered options and uncount replaced ones in a single
+    UPDATE. Pass create_counters=False when the added options are known to
+    have a counter row already, to skip creating the missing ones.
+    """
+    option_ids = [*added_option_ids, *removed_option_ids]
+    if not option_ids:
+        return
+    if added_option_ids and create_counters:
+        OptionPickCount.objects.bulk_create(
+            [OptionPickCount(quiz_id=quiz_id, option_id=option_id)
+             for option_id in added_option_ids],
+            ignore_conflicts=True)
+    OptionPickCount.objects.filter(
+        quiz_id=quiz_id, option_id__in=option_ids).update(
+        count=Case(When(option_id__in=added_option_ids,
+                        then=F('count') + 1),
+                   default=Greatest(F('count') - 1, 0)))
+
+
+def rebuild_picks(quizzes):
+    """
+    Rebuild the pick counters of the given quizzes from their answers.
+    """
+    with transaction.atomic():
+        OptionPickCount.objects.filter(quiz__in=quizzes).delete()
+        counts = Answer.objects.filter(challenge__quiz__in=quizzes).values(
+            'challenge__quiz_id', 'option_id').annotate(
+            count=Count('pk')).order_by()
+        rows = (OptionPickCount(quiz_id=row['challenge__quiz_id'],
+                                option_id=row['option_id'],
+                                count=row['count'])
+                for row in counts.iterator(chunk_size=2000))
+        return len(OptionPickCount.objects.bulk_create(rows, batch_size=2000))
+
+
+def quiz_answer_stats(quiz):
+    """
+    Pick counts per option, percent correct per question and the average
+    score of a quiz, read from the pick and score counters.
+
+    Correctness is taken from the options at read time, so the numbers
+    stay right when a creator changes the correct option. The average
+    score is over finished challenges only; those are rescored when the
+    correct option changes.
+    """
+    picks = dict(OptionPickCount.objects.filter(quiz=quiz).values_list(
+        'option_id', 'count'))
+    questions = Question.objects.filter(quizzes=quiz).prefetch_related(
+        'options').order_by('id')
+
+    results = []
+    for question in questions:
+        options = [{'id': option.id,
+                    'option_text': option.option_text,
+                    'is_correct': option.is_correct,
+                    'is_active': option.is_active,
+                    'picks': picks.get(option.id, 0)}
+                   for option in question.options.all()]
+        answers = sum(option['picks'] for option in options)
+        correct = sum(option['picks'] for option in options
+                      if option['is_correct'])
+        results.append({
+            'id': question.id,
+            'question_text': question.question_text,
+            'answers': answers,
+            'percent_correct': round(100 * correct / answers, 2)
+            if answers else None,
+            'options': options,
+        })
+
+    finished = ScoreCount.objects.filter(quiz=quiz).aggregate(
+        challenges=Sum('count'), total=Sum(F('score') * F('count')))
+    return {
+        'quiz': quiz.id,
+        'number_of_challenges': quiz.number_of_challenges,
+        'number_of_finished_challenges': finished['challenges'] or 0,
+        'average_score': round(finished['total'] / finished['challenges'], 2)
+        if finished['challenges'] else None,
+        'questions': results,
+    }
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Cache of authenticated tokens in the shared Django cache.
+
+    Only ids and flags are cached, never the password hash; fresh Token,
+    User and UserProfile instances are rebuilt from them on every request
+    and their other fields load on access. Entries are dropped when a
+    token is deleted or its user or profile changes, from any process
+    sharing the cache. The timeout bounds how long a change that skips
+    the signals, like a queryset update(), goes unnoticed.
+    """
+    key_prefix = 'auth-token'
+    user_fields = ['id', 'username', 'is_active', 'is_staff', 'is_superuser']
+    profile_fields = ['id', 'user_id', 'is_creator']
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'TOKEN_CACHE_TIMEOUT', 60)
+
+    def get_key(self, key):
+        return f"{self.key_prefix}:{key}"
+
+    def get_user_key(self, user_id):
+        return f"{self.key_prefix}-user:{user_id}"
+
+    @staticmethod
+    def rebuild(model, values):
+        """
+        Return a model instance from a {attname: value} dict, with the
+        other fields deferred.
+        """
+        fields = [field.attname for field in model._meta.concrete_fields
+                  if field.attname in values]
+        return model.from_db(None, fields, [values[name] for name in fields])
+
+    def get(self, token_model, key):
+        """
+        Return a Token with its user and profile set, or None on a miss.
+        """
+        entry = cache.get(self.get_key(key))
+        if entry is None:
+            return None
+        user_model = token_model._meta.get_field('user').related_model
+        user = self.rebuild(user_model, entry['user'])
+        if entry['profile'] is not None:
+            profile_model = user_model._meta.get_field('user').related_model
+            user.user = self.rebuild(profile_model, entry['profile'])
+        token = self.rebuild(token_model, entry['token'])
+        token.user = user
+        return token
+
+    def set(self, key, token):
+        user = token.user
+        profile = getattr(user, 'user', None)
+        entry = {
+            'token': {'key': token.key, 'user_id': token.user_id,
+                      'created': token.created},
+            'user': {name: getattr(user, name) for name in self.user_fields},
+            'profile': None if profile is None else
+            {name: getattr(profile, name) for name in self.profile_fields},
+        }
+        cache.set_many({self.get_key(key): entry,
+                        self.get_user_key(user.pk): key}, self.timeout)
+
+    def invalidate(self, key):
+        cache.delete(self.get_key(key))
+
+    def invalidate_user(self, user_id):
+        user_key = self.get_user_key(user_id)
+        key = cache.get(user_key)
+        if key is not None:
+            cache.delete_many([self.get_key(key), user_key])
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that loads the user and its UserProfile in one
+    query and serves repeated requests from token_cache.
+    """
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        token = token_cache.get(model, key)
+        if token is None:
+            try:
+                token = model.objects.select_related('user__user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            token_cache.set(key, token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Prefetch
+from django.utils import timezone
+from quiz.models import Option, Quiz
+
+
+class QuizContentCache:
+    """
+    Read-through cache of the question/option tree of a quiz.
+
+    Entries are keyed by quiz id and Quiz.content_version. Any change to
+    the questions or options of a quiz bumps its version, so stale entries
+    are never read again and simply expire.
+    """
+    key_prefix = 'quiz-content'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'QUIZ_CONTENT_CACHE_TIMEOUT', None)
+
+    def get_key(self, quiz):
+        return f"{self.key_prefix}:{quiz.id}:{quiz.content_version}"
+
+    def get(self, quiz):
+        return self.get_many([quiz])[quiz.id]
+
+    def get_many(self, quizzes):
+        """
+        Return {quiz_id: content} for the given quizzes, loading every
+        missing entry from the database in one pass.
+        """
+        keys = {self.get_key(quiz): quiz.id for quiz in quizzes}
+        found = cache.get_many(keys)
+        self.hits += len(found)
+        missing = [quiz_id for key, quiz_id in keys.items()
+                   if key not in found]
+        self.misses += len(missing)
+
+        contents = {keys[key]: content for key, content in found.items()}
+        if missing:
+            loaded = self.load(missing)
+            cache.set_many({key: loaded[quiz_id] for key, quiz_id
+                            in keys.items() if quiz_id in loaded},
+                           self.timeout)
+            contents.update(loaded)
+        return contents
+
+    def load(self, quiz_ids):
+        """
+        Build the content of the given quizzes with two queries.
+
+        Each content is a dict with the serialized questions and their
+        active options, plus an {option_id: question_id} map used to
+        validate answers.
+        """
+        links = Quiz.questions.through.objects.filter(
+            quiz_id__in=quiz_ids).select_related('question').prefetch_related(
+            Prefetch('question__options',
+                     queryset=Option.objects.filter(is_active=True)))
+        contents = defaultdict(lambda: {'questions': [], 'options': {}})
+        for link in links.order_by('quiz_id', 'question_id'):
+            question = link.question
+            options = question.options.all()
+            content = contents[link.quiz_id]
+            content['questions'].append({
+                'id': question.id,
+                'question_text': question.question_text,
+                'options': [{'id': option.id,
+                             'option_text': option.option_text,
+                             'is_correct': option.is_correct}
+                            for option in options],
+            })
+            content['options'].update(
+                {option.id: question.id for option in options})
+        return {quiz_id: contents[quiz_id] for quiz_id in quiz_ids}
+
+    def invalidate(self, quizzes):
+        """
+        Bump the content version of the given quiz queryset.
+
+        The quizzes' updated_on moves too, since their content changed.
+        """
+        count = quizzes.update(content_version=F('content_version') + 1,
+                               updated_on=timezone.now())
+        self.invalidations += count
+        return count
+
+    def invalidate_questions(self, question_ids):
+        return self.invalidate(Quiz.objects.filter(
+            pk__in=Quiz.questions.through.objects.filter(
+                question_id__in=question_ids).values('quiz_id')))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
+
+
+quiz_content_cache = QuizContentCache()
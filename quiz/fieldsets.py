@@ -0,0 +1,129 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def select_fields(query_params, field_names):
+    """
+    Return the field names kept by the ?fields= and ?omit= parameters, in
+    their declared order. Unknown names are a validation error.
+    """
+    fields = parse_field_names(query_params.get('fields'))
+    omit = parse_field_names(query_params.get('omit'))
+    unknown = [name for name in fields + omit if name not in field_names]
+    if unknown:
+        raise serializers.ValidationError(
+            {'fields': [f"Unknown fields: {', '.join(unknown)}."]})
+    return [name for name in field_names
+            if (not fields or name in fields) and name not in omit]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin keeping only the fields listed in ?fields= and
+    dropping those listed in ?omit= on read requests. Dropped fields are
+    never bound, so their nested serializers and SerializerMethodField
+    getters do not run.
+
+    project() restricts a queryset to what the kept fields read. Model
+    fields and relations are found from the field sources; fields with
+    another source, like method fields, declare the columns ('only') and
+    prefetch lookups ('prefetch') they need in Meta.field_requirements.
+    """
+
+    def is_sparse(self):
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return False
+        # Only the top-level serializer, or the child of a top-level list
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        self.omitted_fields = {}
+        if not self.is_sparse():
+            return fields
+        selected = select_fields(self.context['request'].query_params,
+                                 list(fields))
+        self.omitted_fields = {name: field for name, field in fields.items()
+                               if name not in selected}
+        return {name: fields[name] for name in selected}
+
+    def get_field_requirements(self, name, field):
+        """
+        Return the model columns a field reads, or None when they are
+        unknown, and the prefetch lookups it needs.
+        """
+        requirements = getattr(self.Meta, 'field_requirements', {})
+        if name in requirements:
+            return (requirements[name].get('only', []),
+                    requirements[name].get('prefetch', []))
+        # Omitted fields are never bound, so their source may be unset
+        source = (field.source or name).split('.')[0]
+        try:
+            model_field = self.Meta.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None, []
+        if model_field.many_to_many or model_field.one_to_many:
+            return [], [source]
+        return [source], []
+
+    def project(self, queryset, extra_columns=()):
+        """
+        Defer the columns and drop the prefetches that only omitted fields
+        need. extra_columns are kept for the caller, e.g. the pagination
+        ordering.
+        """
+        fields = self.fields
+        if not self.omitted_fields:
+            return queryset
+        columns = set(extra_columns)
+        needed = set()
+        for name, field in fields.items():
+            field_columns, prefetches = self.get_field_requirements(name, field)
+            if field_columns is None or columns is None:
+                columns = None
+            else:
+                columns.update(field_columns)
+            needed.update(prefetches)
+        dropped = {prefetch for name, field in self.omitted_fields.items()
+                   for prefetch in self.get_field_requirements(name, field)[1]
+                   } - needed
+
+        if dropped:
+            lookups = [
+                lookup for lookup in queryset._prefetch_related_lookups
+                if (lookup.prefetch_to if isinstance(lookup, Prefetch)
+                    else lookup).split('__')[0] not in dropped]
+            queryset = queryset.prefetch_related(None).prefetch_related(
+                *lookups)
+        if columns is not None:
+            # Relations loaded with select_related cannot be deferred
+            select_related = queryset.query.select_related
+            if isinstance(select_related, dict):
+                columns.update(select_related)
+            queryset = queryset.only(*columns)
+        return queryset
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin projecting the queryset onto the fields selected with
+    ?fields= and ?omit=, see SparseFieldsetMixin.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        if not isinstance(serializer, SparseFieldsetMixin):
+            return queryset
+        return serializer.project(
+            queryset, getattr(self.paginator, 'position_fields', ()))
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from oper.sqlite3.base import apply_sqlite_pragmas
+
+# What a connection gets without SQLITE_PRAGMAS: Django opens SQLite with
+# a 5 second busy timeout and otherwise keeps the library defaults
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+    'mmap_size': 0,
+}
+
+SCHEMA = """
+    CREATE TABLE challenge (id INTEGER PRIMARY KEY, running_score INTEGER);
+    CREATE TABLE answer (
+        id INTEGER PRIMARY KEY, challenge_id INTEGER, question_id INTEGER,
+        option_id INTEGER, UNIQUE (challenge_id, question_id));
+"""
+
+
+class Command(BaseCommand):
+    help = ("Measure concurrent write throughput of a scratch SQLite "
+            "database with the stock Django connection settings and with "
+            "those of the oper.sqlite3 backend. The workload mirrors answer "
+            "submission: read the previous answer, upsert it and update "
+            "the running score.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--challenges', type=int, default=100)
+
+    def handle(self, *args, **options):
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+        configs = [('django.db.backends.sqlite3', DEFAULT_PRAGMAS, 'BEGIN'),
+                   ('SQLITE_PRAGMAS only', pragmas, 'BEGIN'),
+                   ('oper.sqlite3', pragmas, 'BEGIN IMMEDIATE')]
+        for label, pragmas, begin in configs:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                commits, errors = self.run(path, pragmas, begin, options)
+            self.stdout.write(
+                f"{label:>26}: {commits / options['seconds']:8.1f} writes/s, "
+                f"{errors} 'database is locked' errors")
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(path, isolation_level=None,
+                                     check_same_thread=False)
+        apply_sqlite_pragmas(connection, pragmas)
+        return connection
+
+    def run(self, path, pragmas, begin, options):
+        connection = self.connect(path, pragmas)
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            'INSERT INTO challenge (id, running_score) VALUES (?, 0)',
+            [(pk,) for pk in range(options['challenges'])])
+        connection.close()
+
+        deadline = time.monotonic() + options['seconds']
+        totals = {'commits': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def worker(seed):
+            connection = self.connect(path, pragmas)
+            commits = errors = 0
+            n = seed
+            while time.monotonic() < deadline:
+                n += 1
+                challenge_id = n % options['challenges']
+                question_id = n % 10
+                try:
+                    connection.execute(begin)
+                    connection.execute(
+                        'SELECT option_id FROM answer WHERE challenge_id = ? '
+                        'AND question_id = ?', (challenge_id, question_id))
+                    connection.execute(
+                        'INSERT INTO answer (challenge_id, question_id, '
+                        'option_id) VALUES (?, ?, ?) ON CONFLICT (challenge_id, '
+                        'question_id) DO UPDATE SET option_id = excluded.option_id',
+                        (challenge_id, question_id, n))
+                    connection.execute(
+                        'UPDATE challenge SET running_score = running_score + 1 '
+                        'WHERE id = ?', (challenge_id,))
+                    connection.execute('COMMIT')
+                    commits += 1
+                except sqlite3.OperationalError:
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                    errors += 1
+            connection.close()
+            with lock:
+                totals['commits'] += commits
+                totals['errors'] += errors
+
+        threads = [threading.Thread(target=worker, args=(i * 7919,))
+                   for i in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return totals['commits'], totals['errors']
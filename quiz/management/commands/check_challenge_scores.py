@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from quiz.models import Challenge
+from quiz.scoring import find_inconsistent_scores, recompute_scores
+
+
+class Command(BaseCommand):
+    help = "Verify stored challenge scores against a full recount of the answers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help="Overwrite the inconsistent scores with the recount.")
+
+    def handle(self, *args, **options):
+        inconsistent = find_inconsistent_scores().values_list(
+            'id', 'running_score', 'no_of_correct_answers', 'expected_score')
+        challenge_ids = []
+        for pk, running, finished, expected in inconsistent.iterator():
+            challenge_ids.append(pk)
+            self.stdout.write(
+                f"Challenge {pk}: running score {running}, finished score "
+                f"{finished}, expected {expected}")
+
+        if not challenge_ids:
+            self.stdout.write(self.style.SUCCESS("All challenge scores are consistent."))
+            return
+        if options['fix']:
+            fixed = recompute_scores(Challenge.objects.filter(pk__in=challenge_ids))
+            self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} challenges."))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f"{len(challenge_ids)} challenges have inconsistent scores."))
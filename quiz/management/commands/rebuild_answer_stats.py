@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from quiz.analytics import rebuild_picks
+from quiz.models import Quiz
+from quiz.scoring import rebuild_score_counts
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the per-option answer pick counters from the answers "
+            "and the per-score counters from the finished challenges.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quiz', type=int, action='append', dest='quiz_ids',
+            help="Only rebuild the counters of this quiz. Repeatable.")
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.all()
+        if options['quiz_ids']:
+            quizzes = quizzes.filter(pk__in=options['quiz_ids'])
+        rows = rebuild_picks(quizzes)
+        scores = rebuild_score_counts(quizzes)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rows} pick counters and {scores} score counters."))
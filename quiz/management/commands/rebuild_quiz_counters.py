@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from quiz.signals import refresh_quiz_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized question and challenge counters of every quiz."
+
+    def handle(self, *args, **options):
+        updated = refresh_quiz_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt counters for {updated} quizzes."))
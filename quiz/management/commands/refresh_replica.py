@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from quiz.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = ("Copy the primary SQLite database into the replica SQLite "
+            "database with the SQLite backup API. Stands in for replication "
+            "when developing locally.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help="Keep refreshing the replica every INTERVAL seconds.")
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No replica database is configured, set "
+                               "DATABASE_REPLICA_URL.")
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError("Only SQLite primaries and replicas can be "
+                               "refreshed this way.")
+
+        while True:
+            started = time.monotonic()
+            primary.ensure_connection()
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(self.style.SUCCESS(
+                f"Refreshed '{alias}' in "
+                f"{time.monotonic() - started:.3f}s."))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from quiz.models import Challenge, Quiz
+from quiz.scoring import recompute_scores, rescore_questions
+
+
+class Command(BaseCommand):
+    help = "Recompute challenge scores from their answers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--question', type=int, action='append', dest='question_ids',
+            help="Only rescore challenges answering this question. Repeatable.")
+        parser.add_argument(
+            '--quiz', type=int, action='append', dest='quiz_ids',
+            help="Only rescore challenges of this quiz. Repeatable.")
+
+    def handle(self, *args, **options):
+        if options['question_ids']:
+            updated = rescore_questions(options['question_ids'])
+        else:
+            quiz_ids = options['quiz_ids'] or Quiz.objects.values_list(
+                'id', flat=True)
+            updated = 0
+            # One UPDATE per quiz keeps each statement's locks short
+            for quiz_id in list(quiz_ids):
+                updated += recompute_scores(
+                    Challenge.objects.filter(quiz_id=quiz_id))
+        self.stdout.write(self.style.SUCCESS(f"Rescored {updated} challenges."))
@@ -0,0 +1,228 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.db import connections
+from rest_framework import serializers
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# name: (help text, buckets)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Time spent handling the request.', SECONDS_BUCKETS),
+    'http_request_db_queries': (
+        'SQL queries run while handling the request.', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': (
+        'Time spent running SQL queries.', SECONDS_BUCKETS),
+    'http_request_serializer_duration_seconds': (
+        'Time spent building serializer data, including the queries it '
+        'runs.', SECONDS_BUCKETS),
+}
+
+# Statistics of the request handled by the current thread, if any
+_current_request = ContextVar('current_request', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'in_serializer')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.in_serializer = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class MetricsRegistry:
+    """
+    Per-process histograms of request statistics, labelled by URL name.
+
+    Every thread records into its own shard, so observing a request takes
+    no lock. Shards are only merged, under a lock, when collected; those
+    of finished threads are folded into a single retired shard.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._collect_lock = threading.Lock()
+
+    def get_shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def observe(self, view, values):
+        shard = self.get_shard()
+        for name, value in values.items():
+            histogram = shard.get((view, name))
+            if histogram is None:
+                buckets = HISTOGRAMS[name][1]
+                histogram = shard[(view, name)] = [[0] * (len(buckets) + 1), 0]
+            histogram[0][bisect_left(HISTOGRAMS[name][1], value)] += 1
+            histogram[1] += value
+
+    @staticmethod
+    def merge(target, shard):
+        for key, (counts, total) in list(shard.items()):
+            histogram = target.setdefault(key, [[0] * len(counts), 0])
+            histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+            histogram[1] += total
+
+    def collect(self):
+        """
+        Return {(view, name): [bucket counts, sum]} over every thread.
+        """
+        with self._collect_lock:
+            merged = {}
+            for entry in list(self._shards):
+                thread, shard = entry
+                if thread.is_alive():
+                    self.merge(merged, shard)
+                else:
+                    self.merge(self._retired, shard)
+                    self._shards.remove(entry)
+            self.merge(merged, self._retired)
+            return merged
+
+    def render(self):
+        """
+        Render the histograms in the Prometheus text exposition format.
+        """
+        collected = self.collect()
+        lines = []
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (view, metric), (counts, total) in sorted(collected.items()):
+                if metric != name:
+                    continue
+                label = f'view="{view}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}}} {total}')
+                lines.append(f'{name}_count{{{label}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """
+    Record queries, DB time, serializer time and latency of every request
+    into the registry, and report them in X-DB-Queries and Server-Timing
+    response headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unresolved'
+        registry.observe(view, {
+            'http_request_duration_seconds': duration,
+            'http_request_db_queries': stats.queries,
+            'http_request_db_duration_seconds': stats.db_time,
+            'http_request_serializer_duration_seconds': stats.serializer_time,
+        })
+        response.headers['X-DB-Queries'] = str(stats.queries)
+        response.headers['Server-Timing'] = (
+            f'db;dur={stats.db_time * 1000:.1f}, '
+            f'serializer;dur={stats.serializer_time * 1000:.1f}, '
+            f'total;dur={duration * 1000:.1f}')
+        return response
+
+
+def timed_data(data):
+    """
+    Wrap a serializer .data property to add the time spent in it to the
+    current request, counting nested serializers only once.
+    """
+
+    def get_data(serializer):
+        stats = _current_request.get()
+        if stats is None or stats.in_serializer:
+            return data.fget(serializer)
+        stats.in_serializer = True
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            stats.serializer_time += time.perf_counter() - started
+            stats.in_serializer = False
+
+    return property(get_data)
+
+
+_timed_classes = {}
+
+
+def timed_serializer_class(serializer_class):
+    """
+    Return a subclass of serializer_class, and of its list serializer for
+    many=True, whose .data is timed with timed_data().
+    """
+    timed = _timed_classes.get(serializer_class)
+    if timed is None:
+        meta = getattr(serializer_class, 'Meta', object)
+        list_class = getattr(meta, 'list_serializer_class',
+                             serializers.ListSerializer)
+        timed_list_class = type(list_class.__name__, (list_class,),
+                                {'data': timed_data(list_class.data)})
+        timed = _timed_classes[serializer_class] = type(
+            serializer_class.__name__, (serializer_class,), {
+                '__module__': serializer_class.__module__,
+                'data': timed_data(serializer_class.data),
+                'Meta': type('Meta', (meta,), {
+                    'list_serializer_class': timed_list_class}),
+            })
+    return timed
+
+
+class TimedSerializerMixin:
+    """
+    View mixin recording the time spent building the data of the
+    serializers from get_serializer() as the request's serializer time.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        # The schema generator reads the serializers, not their data
+        if not getattr(self, 'swagger_fake_view', False):
+            serializer_class = timed_serializer_class(serializer_class)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
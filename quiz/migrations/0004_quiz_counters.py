@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Quiz = apps.get_model('quiz', 'Quiz')
+    Challenge = apps.get_model('quiz', 'Challenge')
+    question_counts = Quiz.questions.through.objects.filter(
+        quiz=models.OuterRef('pk')).values('quiz').annotate(
+        count=models.Count('pk')).values('count')
+    challenge_counts = Challenge.objects.filter(
+        quiz=models.OuterRef('pk')).values('quiz').annotate(
+        count=models.Count('pk')).values('count')
+    Quiz.objects.update(
+        number_of_questions=Coalesce(
+            models.Subquery(question_counts), 0),
+        number_of_challenges=Coalesce(
+            models.Subquery(challenge_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_option_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='number_of_challenges',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='number_of_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:31
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_quiz_counters'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='option',
+            unique_together={('question', 'option_text')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='question',
+            unique_together={('question_text',)},
+        ),
+    ]
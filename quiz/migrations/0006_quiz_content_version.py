@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_question_and_option_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
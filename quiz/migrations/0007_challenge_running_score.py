@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:42
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_running_score(apps, schema_editor):
+    Challenge = apps.get_model('quiz', 'Challenge')
+    Answer = apps.get_model('quiz', 'Answer')
+    correct_answers = Answer.objects.filter(
+        challenge=models.OuterRef('pk'), option__is_correct=True).values(
+        'challenge').annotate(count=models.Count('pk')).values('count')
+    Challenge.objects.update(
+        running_score=Coalesce(models.Subquery(correct_answers), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_quiz_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='running_score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_running_score,
+                             migrations.RunPython.noop),
+    ]
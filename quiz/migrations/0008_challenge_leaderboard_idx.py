@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_challenge_running_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(condition=models.Q(('is_finished', True)), fields=['quiz', '-no_of_correct_answers', 'finished_on', 'id'], name='challenge_leaderboard_idx'),
+        ),
+    ]
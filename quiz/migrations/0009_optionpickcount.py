@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_pick_counts(apps, schema_editor):
+    Answer = apps.get_model('quiz', 'Answer')
+    OptionPickCount = apps.get_model('quiz', 'OptionPickCount')
+    counts = Answer.objects.values('challenge__quiz_id', 'option_id').annotate(
+        count=models.Count('pk')).order_by()
+    OptionPickCount.objects.bulk_create(
+        [OptionPickCount(quiz_id=row['challenge__quiz_id'],
+                         option_id=row['option_id'], count=row['count'])
+         for row in counts.iterator(chunk_size=2000)],
+        batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_challenge_leaderboard_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OptionPickCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('option', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='quiz.option')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='option_picks', to='quiz.quiz')),
+            ],
+            options={
+                'unique_together': {('quiz', 'option')},
+            },
+        ),
+        migrations.RunPython(populate_pick_counts,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_optionpickcount'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['user', '-created_on', '-id'], name='challenge_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['quiz', '-created_on', '-id'], name='challenge_quiz_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='option',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['question'], name='option_question_active_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_answer_question(apps, schema_editor):
+    Answer = apps.get_model('quiz', 'Answer')
+    Option = apps.get_model('quiz', 'Option')
+    Answer.objects.update(question_id=models.Subquery(
+        Option.objects.filter(pk=models.OuterRef('option_id')).values(
+            'question_id')[:1]))
+
+    # Concurrent submissions could store two answers to one question;
+    # keep the latest before the unique constraint is added
+    duplicates = Answer.objects.values('challenge_id', 'question_id').annotate(
+        count=models.Count('pk'), latest=models.Max('pk')).filter(count__gt=1)
+    for duplicate in duplicates.iterator():
+        Answer.objects.filter(
+            challenge_id=duplicate['challenge_id'],
+            question_id=duplicate['question_id']).exclude(
+            pk=duplicate['latest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='question',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quiz.question'),
+        ),
+        migrations.RunPython(populate_answer_question,
+                             migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='answer',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quiz.question'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='answer',
+            unique_together={('challenge', 'question')},
+        ),
+    ]
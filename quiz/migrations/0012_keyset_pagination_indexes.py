@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0011_answer_question'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['created_by', '-created_on', '-id'], name='question_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['user', '-created_on', '-id'], name='quiz_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['-created_on', '-id'], name='userprofile_created_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_score_counts(apps, schema_editor):
+    Challenge = apps.get_model('quiz', 'Challenge')
+    ScoreCount = apps.get_model('quiz', 'ScoreCount')
+    counts = Challenge.objects.filter(
+        is_finished=True, no_of_correct_answers__isnull=False).values(
+        'quiz_id', 'no_of_correct_answers').annotate(
+        count=models.Count('pk')).order_by()
+    ScoreCount.objects.bulk_create(
+        [ScoreCount(quiz_id=row['quiz_id'],
+                    score=row['no_of_correct_answers'], count=row['count'])
+         for row in counts.iterator(chunk_size=2000)],
+        batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0012_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='quiz.quiz')),
+            ],
+            options={
+                'unique_together': {('quiz', 'score')},
+            },
+        ),
+        migrations.RunPython(populate_score_counts,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def recount_answer_stats(apps, schema_editor):
+    """
+    0007 and 0009 backfilled the scores and pick counters before 0011
+    dropped duplicate answers to one question, so recount them from the
+    remaining answers, then rebuild the score counters from the result.
+    """
+    Challenge = apps.get_model('quiz', 'Challenge')
+    Answer = apps.get_model('quiz', 'Answer')
+    OptionPickCount = apps.get_model('quiz', 'OptionPickCount')
+    ScoreCount = apps.get_model('quiz', 'ScoreCount')
+
+    correct_answers = Coalesce(models.Subquery(
+        Answer.objects.filter(
+            challenge=models.OuterRef('pk'), option__is_correct=True).values(
+            'challenge').annotate(count=models.Count('pk')).values('count')),
+        0)
+    Challenge.objects.update(
+        running_score=correct_answers,
+        no_of_correct_answers=models.Case(
+            models.When(is_finished=True, then=correct_answers),
+            default=models.F('no_of_correct_answers')))
+
+    OptionPickCount.objects.all().delete()
+    picks = Answer.objects.values('challenge__quiz_id', 'option_id').annotate(
+        count=models.Count('pk')).order_by()
+    OptionPickCount.objects.bulk_create(
+        [OptionPickCount(quiz_id=row['challenge__quiz_id'],
+                         option_id=row['option_id'], count=row['count'])
+         for row in picks.iterator(chunk_size=2000)],
+        batch_size=2000)
+
+    ScoreCount.objects.all().delete()
+    scores = Challenge.objects.filter(
+        is_finished=True, no_of_correct_answers__isnull=False).values(
+        'quiz_id', 'no_of_correct_answers').annotate(
+        count=models.Count('pk')).order_by()
+    ScoreCount.objects.bulk_create(
+        [ScoreCount(quiz_id=row['quiz_id'],
+                    score=row['no_of_correct_answers'], count=row['count'])
+         for row in scores.iterator(chunk_size=2000)],
+        batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0013_scorecount'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_answer_stats,
+                             migrations.RunPython.noop),
+    ]
@@ -15,6 +15,13 @@ class UserProfile(BaseModel):
                                 related_name='user')
     is_creator = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the profile list
+            models.Index(fields=['-created_on', '-id'],
+                         name='userprofile_created_idx'),
+        ]
+
     def __str__(self):
         return self.user.username
 
@@ -25,6 +32,11 @@ class Question(BaseModel):
 
     class Meta:
         unique_together = ('question_text',)
+        indexes = [
+            # Keyset pagination of a creator's questions
+            models.Index(fields=['created_by', '-created_on', '-id'],
+                         name='question_creator_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.id} - {self.question_text[:50]}"
@@ -39,6 +51,12 @@ class Option(BaseModel):
 
     class Meta:
         unique_together = ('question', 'option_text')
+        indexes = [
+            # Only active options are shown and answerable
+            models.Index(fields=['question'],
+                         condition=models.Q(is_active=True),
+                         name='option_question_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.id} - {self.option_text[:50]}"
@@ -49,15 +67,68 @@ class Quiz(BaseModel):
     description = models.TextField()
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     questions = models.ManyToManyField(Question, related_name="quizzes")
+    # Denormalized counters, maintained by quiz.signals
+    number_of_questions = models.PositiveIntegerField(default=0)
+    number_of_challenges = models.PositiveIntegerField(default=0)
+    # Bumped on any change to the questions or options of the quiz
+    content_version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a creator's quizzes
+            models.Index(fields=['user', '-created_on', '-id'],
+                         name='quiz_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.id} - {self.title}"
 
-    def get_number_of_questions(self):
-        return self.questions.count()
 
-    def get_number_of_challenges(self):
-        return self.challenges.count()
+class ChallengeQuerySet(models.QuerySet):
+    def with_question_tree(self):
+        """
+        Load the quiz and the challenge's own answers; the questions and
+        options are read from quiz.cache.quiz_content_cache.
+        """
+        return self.select_related('quiz').prefetch_related('user_answers')
+
+    def leaderboard(self, quiz_id):
+        """
+        Finished challenges of a quiz in rank order, read from
+        challenge_leaderboard_idx.
+        """
+        return self.filter(quiz_id=quiz_id, is_finished=True).order_by(
+            '-no_of_correct_answers', 'finished_on', 'id')
+
+    def ties_ahead_of(self, challenge):
+        """
+        Return the finished challenges with the same score as challenge
+        that rank before it.
+        """
+        return self.leaderboard(challenge.quiz_id).filter(
+            models.Q(finished_on__lt=challenge.finished_on) |
+            models.Q(finished_on=challenge.finished_on, id__lt=challenge.id),
+            # Redundant with the Q above, but lets the index range stop
+            # at the challenge instead of running through every tie
+            finished_on__lte=challenge.finished_on,
+            no_of_correct_answers=challenge.no_of_correct_answers)
+
+    def rank_of(self, challenge):
+        """
+        Return the 1-based leaderboard rank of a finished challenge.
+
+        Challenges with a higher score are summed from the per-score
+        counters in ScoreCount. The ties finished earlier are counted on
+        challenge_leaderboard_idx, from the start of the (quiz, score)
+        range up to the challenge's finish time. That count is linear in
+        the number of ties ahead, which stays small unless most
+        participants share a score; it does not grow with the rank.
+        """
+        higher = ScoreCount.objects.filter(
+            quiz_id=challenge.quiz_id,
+            score__gt=challenge.no_of_correct_answers).aggregate(
+            total=models.Sum('count'))['total'] or 0
+        return higher + self.ties_ahead_of(challenge).count() + 1
 
 
 class Challenge(BaseModel):
@@ -67,22 +138,88 @@ class Challenge(BaseModel):
     is_accepted = models.BooleanField(default=False)
     is_finished = models.BooleanField(default=False)
     no_of_correct_answers = models.IntegerField(null=True, blank=True)
+    # Correct answers so far, kept up to date as answers are submitted and
+    # copied to no_of_correct_answers when the challenge is finished
+    running_score = models.IntegerField(default=0)
     finished_on = models.DateTimeField(null=True, blank=True)
 
+    objects = ChallengeQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'quiz')
+        indexes = [
+            # Participant and per-quiz challenge lists, newest first
+            models.Index(fields=['user', '-created_on', '-id'],
+                         name='challenge_user_created_idx'),
+            models.Index(fields=['quiz', '-created_on', '-id'],
+                         name='challenge_quiz_created_idx'),
+            # Leaderboard order; ties on the score go to the earliest finish
+            models.Index(fields=['quiz', '-no_of_correct_answers',
+                                 'finished_on', 'id'],
+                         condition=models.Q(is_finished=True),
+                         name='challenge_leaderboard_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.quiz.title}"
 
+    def get_answer_map(self):
+        """
+        Return a {question_id: option_id} map of the answers given in
+        this challenge.
+        """
+        return {answer.question_id: answer.option_id
+                for answer in self.user_answers.all()}
+
 
 class Answer(BaseModel):
     challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE,
                                   related_name="user_answers")
     option = models.ForeignKey(Option, on_delete=models.CASCADE)
+    # Denormalized from option so a challenge holds one answer per question
+    question = models.ForeignKey(Question, on_delete=models.CASCADE,
+                                 related_name="answers")
 
     class Meta:
-        unique_together = [["challenge", "option"]]
+        unique_together = [["challenge", "question"]]
+
+    def save(self, *args, **kwargs):
+        self.question_id = self.option.question_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Challenge: {self.challenge} - Option: {self.option.option_text[:50]}"
+
+
+class OptionPickCount(models.Model):
+    """
+    Number of challenges of a quiz whose answer is the given option,
+    maintained by quiz.analytics as answers are submitted.
+    """
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE,
+                             related_name="option_picks")
+    option = models.ForeignKey(Option, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [["quiz", "option"]]
+
+    def __str__(self):
+        return f"Quiz: {self.quiz_id} - Option: {self.option_id} - {self.count}"
+
+
+class ScoreCount(models.Model):
+    """
+    Number of finished challenges of a quiz with the given score,
+    maintained by quiz.scoring as challenges are finished and rescored.
+    """
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE,
+                             related_name="score_counts")
+    score = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [["quiz", "score"]]
+
+    def __str__(self):
+        return f"Quiz: {self.quiz_id} - Score: {self.score} - {self.count}"
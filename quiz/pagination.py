@@ -0,0 +1,144 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over (created_on, id), newest first.
+
+    The cursor encodes the last row of the current page, so every page is
+    a single indexed range scan regardless of how deep the client goes.
+    The total COUNT(*) costs a scan of every matching row, so it is only
+    run when the client asks for it with ?count=true.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    # Columns read from the page rows to build the next cursor
+    position_fields = ('created_on', 'id')
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        if self.include_count(request):
+            self.count = queryset.order_by().count()
+        queryset = self.get_page_queryset(queryset, self.decode_cursor(request))
+
+        # Fetch one extra row to know whether there is a next page
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_queryset(self, queryset, position=None):
+        """
+        Order the queryset and start it after the (created_on, id)
+        position of a decoded cursor.
+        """
+        queryset = queryset.order_by('-created_on', '-id')
+        if position is not None:
+            created_on, pk = position
+            # The redundant created_on bound lets the database seek into
+            # the index instead of scanning it up to the position
+            queryset = queryset.filter(
+                Q(created_on__lt=created_on) |
+                Q(created_on=created_on, id__lt=pk),
+                created_on__lte=created_on)
+        return queryset
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def include_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            created_on, pk = decoded.decode('ascii').split('|')
+            return datetime.fromisoformat(created_on), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        position = f"{instance.created_on.isoformat()}|{instance.pk}"
+        return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        response = {'next': self.get_next_link()}
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'count': {
+                    'type': 'integer',
+                    'description': 'Total number of results, only '
+                                   'returned with ?count=true.',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total number of results.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -0,0 +1,18 @@
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parser for newline delimited JSON.
+
+    Returns a lazy iterator over the non-empty lines of the body, so the
+    caller can decode and process one record at a time.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        if stream is None:
+            return iter(())
+        return (line.decode(encoding) for line in stream if line.strip())
@@ -0,0 +1,197 @@
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from quiz.authentication import CachedTokenAuthentication
+
+PROFILE_NAME_RE = re.compile(
+    r'^(?P<view>[\w-]+)-(?P<timestamp>\d{8}T\d{12})-[0-9a-f]{8}'
+    r'\.(?P<format>collapsed|pstats)$')
+
+
+@lru_cache(maxsize=4096)
+def get_frame_label(code):
+    """
+    Label a code object as path:function, with the path relative to the
+    project or to the installed package it belongs to.
+    """
+    path = code.co_filename
+    if path.startswith(str(settings.BASE_DIR)):
+        path = os.path.relpath(path, settings.BASE_DIR)
+    else:
+        path = path.rpartition('-packages/')[2]
+    return f'{path}:{code.co_name}'
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling the stack of the calling thread from a
+    background thread, cheap enough to run on live traffic.
+
+    Samples are written in the collapsed-stack format read by flame graph
+    tools: one "outer;...;inner count" line per distinct stack.
+    """
+    extension = 'collapsed'
+
+    def __init__(self, interval=None):
+        self.interval = interval or getattr(settings,
+                                            'PROFILING_INTERVAL', 0.005)
+        self.stacks = Counter()
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self.sample, daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._sampler.join()
+
+    def sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(get_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as profile_file:
+            for stack, count in self.stacks.most_common():
+                profile_file.write(f'{stack} {count}\n')
+
+
+class FunctionProfiler:
+    """
+    Deterministic cProfile profiler, written as a pstats file. Exact call
+    counts at the price of a much higher overhead than StackSampler.
+    """
+    extension = 'pstats'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+PROFILERS = {profiler.extension: profiler
+             for profiler in (StackSampler, FunctionProfiler)}
+
+
+def get_profile_dir():
+    return settings.PROFILING_DIR
+
+
+def list_profiles():
+    """
+    Return the stored profiles, newest first.
+    """
+    try:
+        names = os.listdir(get_profile_dir())
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        match = PROFILE_NAME_RE.match(name)
+        if match:
+            profiles.append({
+                'name': name,
+                'view': match['view'],
+                'format': match['format'],
+                'size': os.path.getsize(os.path.join(get_profile_dir(), name)),
+                'created_on': datetime.strptime(
+                    match['timestamp'], '%Y%m%dT%H%M%S%f').replace(
+                    tzinfo=dt_timezone.utc),
+            })
+    return sorted(profiles, key=lambda profile: profile['created_on'],
+                  reverse=True)
+
+
+def save_profile(profiler, view):
+    """
+    Write a finished profile for the given URL name and drop the oldest
+    profiles beyond settings.PROFILING_KEEP.
+    """
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    timestamp = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    name = f'{view}-{timestamp}-{uuid.uuid4().hex[:8]}.{profiler.extension}'
+    profiler.dump(os.path.join(directory, name))
+
+    for profile in list_profiles()[getattr(settings, 'PROFILING_KEEP', 100):]:
+        try:
+            os.remove(os.path.join(directory, profile['name']))
+        except FileNotFoundError:
+            pass
+    return name
+
+
+def is_admin(request):
+    """
+    Whether the request comes from a staff user, by session or by token.
+    """
+    if request.user.is_authenticated:
+        return request.user.is_staff
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+class ProfilingMiddleware:
+    """
+    Profile the view of a request when an admin sends an X-Profile header,
+    whose value picks the profiler ('collapsed' or 'pstats'), or at random
+    for a PROFILING_SAMPLE_RATE fraction of requests with StackSampler.
+
+    The profile is stored under the URL name of the request and its file
+    name is returned in the X-Profile response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def get_profiler(self, request):
+        requested = request.headers.get('X-Profile')
+        if requested and is_admin(request):
+            return PROFILERS.get(requested, StackSampler)()
+        rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        if rate and random.random() < rate:
+            return StackSampler()
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profiler = self.get_profiler(request)
+        if profiler is None:
+            return None
+        with profiler:
+            response = view_func(request, *view_args, **view_kwargs)
+        view = request.resolver_match.url_name or 'unresolved'
+        response.headers['X-Profile'] = save_profile(profiler, view)
+        return response
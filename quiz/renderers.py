@@ -0,0 +1,86 @@
+import csv
+import datetime
+import json
+from itertools import islice
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class RowStreamRenderer(BaseRenderer):
+    """
+    Base class for renderers of flat rows that can also stream them.
+
+    stream() renders an iterable of value tuples lazily, so views can feed
+    it a queryset iterator without building the result in memory. render()
+    handles regular response data such as errors.
+    """
+    charset = 'utf-8'
+    batch_size = 1000
+
+    def render_lines(self, columns, rows):
+        raise NotImplementedError
+
+    def stream(self, columns, rows):
+        """
+        Yield the rendered rows as strings of up to batch_size rows each.
+        """
+        lines = self.render_lines(columns, rows)
+        while batch := list(islice(lines, self.batch_size)):
+            yield ''.join(batch)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        columns = list(items[0]) if items else []
+        rows = ([item.get(column) for column in columns] for item in items)
+        return ''.join(self.stream(columns, rows)).encode(self.charset)
+
+
+class NDJSONRenderer(RowStreamRenderer):
+    """
+    Renders one JSON object per line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_lines(self, columns, rows):
+        encoder = JSONEncoder(separators=(',', ':'))
+        for row in rows:
+            yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+class Echo:
+    """
+    File-like object handing back what csv.writer writes to it.
+    """
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(RowStreamRenderer):
+    """
+    Renders a header line with the column names, then one line per row.
+    Values are formatted as in JSON responses, with empty cells for nulls.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    encoder = JSONEncoder()
+
+    def format_value(self, value):
+        # Same text as in JSON responses, e.g. true or 2024-01-31T12:00:00Z
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return json.dumps(value)
+        if isinstance(value, (datetime.date, datetime.time)):
+            return self.encoder.default(value)
+        return value
+
+    def render_lines(self, columns, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([self.format_value(value) for value in row])
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# Alias the current request reads from, None for the primary
+_read_database = ContextVar('read_database', default=None)
+
+
+def replica_alias():
+    """
+    Return the alias of the read replica, or None if none is configured.
+    """
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    if alias not in connections.databases:
+        return None
+    # Test runs point the replica at the primary as a mirror, where it
+    # could not see the data of the test transaction
+    name = connections[alias].settings_dict['NAME']
+    if name == connections[DEFAULT_DB_ALIAS].settings_dict['NAME']:
+        return None
+    return alias
+
+
+@contextmanager
+def read_from(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def get_pin_key(user):
+    return f'primary-pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    """
+    Send the reads of the user to the primary for REPLICA_STICKY_SECONDS,
+    long enough for the replica to catch up with what they just wrote.
+    The pin is kept in the default cache, which must be shared by the
+    workers (CACHE_URL) for it to follow the user across them.
+    """
+    cache.set(get_pin_key(user), True,
+              getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+def is_pinned_to_primary(user):
+    return cache.get(get_pin_key(user), False)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the database chosen by ReplicaReadMixin for the current
+    request, the primary by default, and every write to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    View mixin that runs safe-method requests against the read replica,
+    unless the user wrote something in the last REPLICA_STICKY_SECONDS.
+    """
+
+    def get_read_database(self):
+        request = self.request
+        if request.method not in SAFE_METHODS:
+            return None
+        if request.user.is_authenticated and is_pinned_to_primary(request.user):
+            return None
+        return replica_alias()
+
+    def dispatch(self, request, *args, **kwargs):
+        # Reads before initial(), such as the token lookup, and everything
+        # after the view returns stay on the primary
+        with read_from(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _read_database.set(self.get_read_database())
+
+
+class PrimaryAfterWriteMiddleware:
+    """
+    Pin users to the primary after every successful unsafe request, so
+    ReplicaReadMixin views read their own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # DRF sets request.user once the view has authenticated the request
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and replica_alias() and request.user.is_authenticated):
+            pin_to_primary(request.user)
+        return response
@@ -0,0 +1,142 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from quiz.models import Answer, Challenge, Quiz, ScoreCount
+
+logger = logging.getLogger(__name__)
+
+
+def correct_answer_count():
+    """
+    Subquery counting the correct answers of the outer Challenge.
+    """
+    return Coalesce(Subquery(
+        Answer.objects.filter(challenge=OuterRef('pk'), option__is_correct=True)
+        .values('challenge').annotate(count=Count('pk')).values('count')), 0)
+
+
+def add_to_running_score(challenge_id, delta):
+    """
+    Atomically add delta to the running score of an unfinished challenge.
+    """
+    if not delta:
+        return 0
+    return Challenge.objects.filter(pk=challenge_id, is_finished=False).update(
+        running_score=F('running_score') + delta)
+
+
+def record_finished_score(quiz_id, score, delta=1):
+    """
+    Count a challenge finished with the given score, or uncount it with a
+    negative delta.
+    """
+    if score is None:
+        return
+    if delta > 0:
+        ScoreCount.objects.bulk_create(
+            [ScoreCount(quiz_id=quiz_id, score=score)], ignore_conflicts=True)
+    ScoreCount.objects.filter(
+        quiz_id=quiz_id, score=score, count__gte=-delta).update(
+        count=F('count') + delta)
+
+
+def rebuild_score_counts(quizzes):
+    """
+    Rebuild the finished score counts of the given quizzes from their
+    challenges.
+    """
+    with transaction.atomic():
+        ScoreCount.objects.filter(quiz__in=quizzes).delete()
+        counts = Challenge.objects.filter(
+            quiz__in=quizzes, is_finished=True,
+            no_of_correct_answers__isnull=False).values(
+            'quiz_id', 'no_of_correct_answers').annotate(
+            count=Count('pk')).order_by()
+        rows = (ScoreCount(quiz_id=row['quiz_id'],
+                           score=row['no_of_correct_answers'],
+                           count=row['count'])
+                for row in counts.iterator(chunk_size=2000))
+        return len(ScoreCount.objects.bulk_create(rows, batch_size=2000))
+
+
+def find_inconsistent_scores(challenges=None):
+    """
+    Return the challenges whose stored scores differ from a recount of
+    their answers, annotated with the recount as expected_score.
+    """
+    if challenges is None:
+        challenges = Challenge.objects.all()
+    return challenges.annotate(expected_score=correct_answer_count()).filter(
+        ~Q(running_score=F('expected_score')) |
+        Q(is_finished=True) & ~Q(no_of_correct_answers=F('expected_score')))
+
+
+def recompute_scores(challenges):
+    """
+    Recompute the scores of the given challenges from their answers with a
+    single UPDATE statement, then rebuild the score counts of their
+    quizzes.
+    """
+    with transaction.atomic():
+        updated = challenges.update(
+            running_score=correct_answer_count(),
+            no_of_correct_answers=Case(
+                When(is_finished=True, then=correct_answer_count()),
+                default=F('no_of_correct_answers')),
+            updated_on=timezone.now())
+        rebuild_score_counts(Quiz.objects.filter(
+            pk__in=challenges.values('quiz_id')))
+    return updated
+
+
+def rescore_questions(question_ids):
+    """
+    Recompute the scores of every challenge with an answer to one of the
+    given questions, with one UPDATE statement per quiz.
+
+    Nothing is loaded into Python beyond the affected quiz ids.
+    """
+    quiz_ids = Quiz.questions.through.objects.filter(
+        question_id__in=question_ids).values_list(
+        'quiz_id', flat=True).distinct()
+    answered = Answer.objects.filter(
+        question_id__in=question_ids).values('challenge_id')
+    updated = 0
+    for quiz_id in list(quiz_ids):
+        with transaction.atomic():
+            updated += recompute_scores(Challenge.objects.filter(
+                quiz_id=quiz_id, pk__in=answered))
+    return updated
+
+
+def _rescore_in_background(question_ids):
+    try:
+        rescore_questions(question_ids)
+    except Exception:
+        logger.exception("Rescoring questions %s failed", question_ids)
+    finally:
+        # The thread opened its own connection
+        connections.close_all()
+
+
+def schedule_rescoring(question_ids):
+    """
+    Rescore the challenges answering the given questions once the current
+    transaction commits, in a background thread unless
+    RESCORE_IN_BACKGROUND is False.
+    """
+    question_ids = list(question_ids)
+
+    def run():
+        if getattr(settings, 'RESCORE_IN_BACKGROUND', True):
+            threading.Thread(target=_rescore_in_background,
+                             args=(question_ids,), daemon=True).start()
+        else:
+            rescore_questions(question_ids)
+
+    transaction.on_commit(run)
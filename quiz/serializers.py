@@ -1,5 +1,16 @@
 from rest_framework import serializers
+from rest_framework.fields import SkipField, empty
+from rest_framework.serializers import as_serializer_error
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models import F, prefetch_related_objects
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
+from quiz.analytics import record_picks
+from quiz.cache import quiz_content_cache
+from quiz.fieldsets import SparseFieldsetMixin
+from quiz.scoring import add_to_running_score, schedule_rescoring
 from quiz.models import UserProfile, Question, Option, Quiz, Challenge, Answer
 from rest_framework.authtoken.models import Token
 
@@ -12,7 +23,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'password']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer()
 
     class Meta:
@@ -46,6 +57,28 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
+def validate_option_set(options):
+    """
+    Validate the options of a single question.
+    """
+    if len(options) < 2:
+        raise serializers.ValidationError(
+            "At least two options are required.")
+
+    correct_count = sum(1 for option in options if option.get('is_correct',
+                                                              False))
+    if correct_count != 1:
+        raise serializers.ValidationError(
+            "Exactly one option must be marked as correct.")
+
+    option_texts = [option.get('option_text') for option in options]
+    if len(set(option_texts)) != len(option_texts):
+        raise serializers.ValidationError(
+            "Option texts must be unique within a question.")
+
+    return options
+
+
 class OptionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Option
@@ -69,17 +102,7 @@ class QuestionCreateSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_by']
 
     def validate_options(self, options):
-        if len(options) < 2:
-            raise serializers.ValidationError(
-                "At least two options are required.")
-
-        correct_count = sum(1 for option in options if option.get('is_correct',
-                                                                  False))
-        if correct_count != 1:
-            raise serializers.ValidationError(
-                "Exactly one option must be marked as correct.")
-
-        return options
+        return validate_option_set(options)
 
     def create(self, validated_data):
         user_profile = self.context['request'].user.user
@@ -93,77 +116,229 @@ class QuestionCreateSerializer(serializers.ModelSerializer):
         return question
 
 
-class QuestionUpdateSerializer(serializers.ModelSerializer):
-    options = OptionUpdateSerializer(many=True)
+class QuestionImportSerializer(serializers.Serializer):
+    """
+    Validates one item of a bulk question import.
 
-    class Meta:
-        model = Question
-        fields = ['id', 'question_text', 'options']
-        read_only_fields = ['created_by']
+    Unlike QuestionCreateSerializer this runs no per-item queries; the
+    uniqueness of question_text is checked for a whole chunk at once.
+    """
+    question_text = serializers.CharField()
+    options = OptionCreateSerializer(many=True)
 
     def validate_options(self, options):
-        if len(options) < 2:
+        return validate_option_set(options)
+
+    def validate_item(self, data):
+        """
+        Validate one decoded import item. Equivalent to run_validation(),
+        errors included, but the options are checked with the option
+        fields directly instead of through the nested serializers, which
+        halves the validation time of large imports.
+        """
+        return self.run_fields(self, data, {'options': self.validate_option_list})
+
+    @staticmethod
+    def run_fields(serializer, data, validators=None):
+        """
+        Validate a dict with the fields of serializer, or the given
+        validators for some of them, like Serializer.to_internal_value().
+        """
+        if not isinstance(data, dict):
+            serializer.fail('invalid', datatype=type(data).__name__)
+        validated = {}
+        errors = {}
+        for name, field in serializer.fields.items():
+            validate = (validators or {}).get(name, field.run_validation)
+            try:
+                validated[name] = validate(data.get(name, empty))
+            except serializers.ValidationError as exc:
+                errors[name] = exc.detail
+            except SkipField:
+                pass
+        if errors:
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def validate_option_list(self, options):
+        options_field = self.fields['options']
+        if options is empty:
+            options_field.fail('required')
+        if options is None:
+            options_field.fail('null')
+        if not isinstance(options, list):
+            message = options_field.error_messages['not_a_list'].format(
+                input_type=type(options).__name__)
             raise serializers.ValidationError(
-                "At least two options are required.")
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]},
+                code='not_a_list')
 
-        correct_count = sum(1 for option in options if option.get('is_correct',
-                                                                  False))
-        if correct_count != 1:
-            raise serializers.ValidationError(
-                "Exactly one option must be marked as correct.")
+        validated = []
+        errors = []
+        for option in options:
+            try:
+                validated.append(self.run_fields(options_field.child, option))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                errors.append(as_serializer_error(exc))
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return self.validate_options(validated)
+
+
+def apply_question_changes(changes):
+    """
+    Apply edits to one or more questions and their options as a diff.
+
+    ``changes`` is a list of (question, validated_data) pairs whose options
+    are prefetched. Only rows that actually change are written: one
+    bulk_update per model, one bulk_create for new options and one UPDATE
+    deactivating the options left out, all in a single transaction.
+    """
+    now = timezone.now()
+    changed_questions = []
+    changed_options = []
+    changed_option_fields = set()
+    new_options = []
+    kept_option_ids = []
+    synced_question_ids = []
+    rescored_question_ids = set()
+
+    for question, data in changes:
+        question_text = data.get('question_text', question.question_text)
+        if question_text != question.question_text:
+            question.question_text = question_text
+            question.updated_on = now
+            changed_questions.append(question)
+
+        options_data = data.get('options')
+        if options_data is None:
+            continue
+        synced_question_ids.append(question.id)
+
+        # Match submitted options to existing ones by id, then by text so
+        # that re-adding a removed option reactivates it
+        existing = {option.id: option for option in question.options.all()}
+        matches = [(existing.pop(option_data.get('id'), None), option_data)
+                   for option_data in options_data]
+        by_text = {option.option_text: option for option in existing.values()}
+        for option, option_data in matches:
+            if option is None:
+                option = by_text.pop(option_data.get('option_text'), None)
+            if option is None:
+                new_options.append(Option(
+                    question=question,
+                    option_text=option_data.get('option_text'),
+                    is_correct=option_data.get('is_correct', False)))
+                continue
+
+            kept_option_ids.append(option.id)
+            changed_fields = [
+                field for field in ('option_text', 'is_correct')
+                if field in option_data
+                and getattr(option, field) != option_data[field]]
+            for field in changed_fields:
+                setattr(option, field, option_data[field])
+            if not option.is_active:
+                option.is_active = True
+                changed_fields.append('is_active')
+            if 'is_correct' in changed_fields:
+                rescored_question_ids.add(question.id)
+            if changed_fields:
+                option.updated_on = now
+                changed_options.append(option)
+                changed_option_fields.update(changed_fields)
+
+    with transaction.atomic():
+        deactivated = 0
+        if synced_question_ids:
+            deactivated = Option.objects.filter(
+                question_id__in=synced_question_ids, is_active=True).exclude(
+                id__in=kept_option_ids).update(is_active=False, updated_on=now)
+        if changed_options:
+            Option.objects.bulk_update(
+                changed_options, sorted(changed_option_fields) + ['updated_on'])
+        if new_options:
+            Option.objects.bulk_create(new_options)
+        if changed_questions:
+            Question.objects.bulk_update(changed_questions,
+                                         ['question_text', 'updated_on'])
+        if deactivated or changed_options or new_options or changed_questions:
+            quiz_content_cache.invalidate_questions(
+                [question.id for question, data in changes])
+        if rescored_question_ids:
+            # Stored scores of challenges answering these questions are stale
+            schedule_rescoring(rescored_question_ids)
+
+    # Reload the options of the synced questions in one query
+    questions = [question for question, data in changes
+                 if question.id in synced_question_ids]
+    for question in questions:
+        getattr(question, '_prefetched_objects_cache', {}).pop('options', None)
+    prefetch_related_objects(questions, 'options')
+
+
+class QuestionBulkUpdateSerializer(serializers.ListSerializer):
+    """
+    Updates many questions in one request; every item must carry the id
+    of one of the questions passed as the instance.
+    """
+
+    def run_child_validation(self, data):
+        questions = {question.id: question for question in self.instance}
+        question_id = data.get('id') if isinstance(data, dict) else None
+        try:
+            self.child.instance = questions[int(question_id)]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError({'id': ['Question not found.']})
+        validated_data = super().run_child_validation(data)
+        validated_data['id'] = self.child.instance.id
+        return validated_data
 
-        return options
+    def validate(self, attrs):
+        # Each change is diffed against the same loaded options, so a
+        # question listed twice would get its new options inserted twice
+        question_ids = [data['id'] for data in attrs]
+        duplicates = sorted({pk for pk in question_ids
+                             if question_ids.count(pk) > 1})
+        if duplicates:
+            raise serializers.ValidationError(
+                f"Questions {duplicates} are listed more than once.")
+        return attrs
 
     def update(self, instance, validated_data):
-        options_data = validated_data.pop('options')
+        questions = {question.id: question for question in instance}
+        apply_question_changes([(questions[data['id']], data)
+                                for data in validated_data])
+        return instance
 
-        # Update existing options or create new ones
-        existing_options = {option.id: option for option in instance.options.all()}
-        updated_options = []
 
-        for option_data in options_data:
-            option_id = option_data.get('id')
-            if option_id and option_id in existing_options:
-                # Update existing option
-                option = existing_options.pop(option_id)
-                option.option_text = option_data.get('option_text',
-                                                     option.option_text)
-                option.is_correct = option_data.get('is_correct',
-                                                    option.is_correct)
-                option.save()
-                updated_options.append(option)
-            else:
-                # Create new option
-                option_data.pop('id', None)
-                new_option = Option.objects.create(question=instance,
-                                                   **option_data)
-                updated_options.append(new_option)
-
-        Option.objects.filter(question=instance).exclude(
-            id__in=[opt.id for opt in updated_options]).update(is_active=False)
-
-        # Update question text if provided
-        instance.question_text = validated_data.get('question_text',
-                                                    instance.question_text)
-        instance.save()
+class QuestionUpdateSerializer(SparseFieldsetMixin,
+                               serializers.ModelSerializer):
+    options = OptionUpdateSerializer(many=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'question_text', 'options']
+        read_only_fields = ['created_by']
+        list_serializer_class = QuestionBulkUpdateSerializer
+
+    def validate_options(self, options):
+        return validate_option_set(options)
+
+    def update(self, instance, validated_data):
+        apply_question_changes([(instance, validated_data)])
         return instance
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     questions = serializers.PrimaryKeyRelatedField(
         queryset=Question.objects.all(), many=True)
-    number_of_questions = serializers.SerializerMethodField()
-    number_of_challenges = serializers.SerializerMethodField()
 
     class Meta:
         model = Quiz
         fields = ['id', 'title', 'description', 'questions', 'number_of_questions', 'number_of_challenges']
-
-    def get_number_of_questions(self, obj):
-        return obj.get_number_of_questions()
-
-    def get_number_of_challenges(self, obj):
-        return obj.get_number_of_challenges()
+        read_only_fields = ['number_of_questions', 'number_of_challenges']
 
     def validate_questions(self, value):
         user_profile = self.context['request'].user.user
@@ -181,6 +356,9 @@ class QuizSerializer(serializers.ModelSerializer):
         questions_data = validated_data.pop('questions')
         quiz = Quiz.objects.create(user=user_profile, **validated_data)
         quiz.questions.set(questions_data)
+        # The counters are updated in the database by quiz.signals
+        quiz.refresh_from_db(fields=['number_of_questions',
+                                     'number_of_challenges'])
         return quiz
 
 
@@ -211,10 +389,107 @@ class ChallengeSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        challenge = Challenge.objects.create(**validated_data)
+        with transaction.atomic():
+            # Serialized with bulk assignments of the quiz, which lock it too
+            Quiz.objects.select_for_update().only('pk').get(
+                pk=validated_data['quiz'].pk)
+            if Challenge.objects.filter(user=validated_data['user'],
+                                        quiz=validated_data['quiz']).exists():
+                raise serializers.ValidationError(
+                    "This quiz has already been assigned to this user.")
+            challenge = Challenge.objects.create(**validated_data)
         return challenge
 
 
+class ProfileFilterSerializer(serializers.Serializer):
+    """
+    Selects participant profiles for a bulk assignment.
+    """
+    username_prefix = serializers.CharField(required=False)
+    joined_after = serializers.DateTimeField(required=False)
+    joined_before = serializers.DateTimeField(required=False)
+
+    @staticmethod
+    def get_queryset(filters):
+        """
+        Return the participant profiles matching the validated filters.
+        """
+        profiles = UserProfile.objects.filter(is_creator=False)
+        if 'username_prefix' in filters:
+            profiles = profiles.filter(
+                user__username__startswith=filters['username_prefix'])
+        if 'joined_after' in filters:
+            profiles = profiles.filter(created_on__gte=filters['joined_after'])
+        if 'joined_before' in filters:
+            profiles = profiles.filter(created_on__lt=filters['joined_before'])
+        return profiles
+
+
+class BulkChallengeSerializer(serializers.Serializer):
+    """
+    Assigns one quiz to many participants, given by id or by a filter.
+    """
+    quiz_id = serializers.PrimaryKeyRelatedField(queryset=Quiz.objects.all())
+    user_ids = serializers.ListField(child=serializers.IntegerField(),
+                                     required=False, allow_empty=False)
+    filter = ProfileFilterSerializer(required=False)
+    batch_size = 1000
+
+    def validate_user_ids(self, user_ids):
+        # One query finds both unknown profiles and creators
+        profiles = dict(UserProfile.objects.filter(
+            id__in=user_ids).values_list('id', 'is_creator'))
+        unknown = [pk for pk in user_ids if pk not in profiles]
+        if unknown:
+            raise serializers.ValidationError(
+                f"User profiles {unknown} do not exist.")
+        creators = [pk for pk in user_ids if profiles[pk]]
+        if creators:
+            raise serializers.ValidationError(
+                f"Cannot assign quizzes to users who are creators: {creators}.")
+        return list(dict.fromkeys(user_ids))
+
+    def validate(self, data):
+        if ('user_ids' in data) == ('filter' in data):
+            raise serializers.ValidationError(
+                "Provide either user_ids or filter.")
+        return data
+
+    def create(self, validated_data):
+        """
+        Create the missing challenges and return the created and skipped
+        counts.
+        """
+        if 'user_ids' in validated_data:
+            user_ids = validated_data['user_ids']
+        else:
+            user_ids = list(ProfileFilterSerializer.get_queryset(
+                validated_data['filter']).values_list('id', flat=True))
+
+        with transaction.atomic():
+            # Lock the quiz so no challenge of it is assigned meanwhile,
+            # then every requested participant without one gets one
+            quiz = Quiz.objects.select_for_update().get(
+                pk=validated_data['quiz_id'].pk)
+            existing = sum(
+                Challenge.objects.filter(
+                    quiz=quiz,
+                    user_id__in=user_ids[start:start + self.batch_size]
+                ).count()
+                for start in range(0, len(user_ids), self.batch_size))
+            Challenge.objects.bulk_create(
+                [Challenge(user_id=user_id, quiz=quiz)
+                 for user_id in user_ids],
+                batch_size=self.batch_size, ignore_conflicts=True)
+            created = len(user_ids) - existing
+            # bulk_create skips the signal that maintains the counter
+            Quiz.objects.filter(pk=quiz.pk).update(
+                number_of_challenges=F('number_of_challenges') + created,
+                updated_on=timezone.now())
+
+        return {'created': created, 'skipped': existing}
+
+
 class AcceptChallengeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Challenge
@@ -223,22 +498,114 @@ class AcceptChallengeSerializer(serializers.ModelSerializer):
 
 
 class AnswerSerializer(serializers.ModelSerializer):
+    """
+    Answers a question of the challenge passed in the context. The option
+    is checked against the cached content of the challenge's quiz, so it
+    is not loaded from the database.
+    """
+    challenge = serializers.PrimaryKeyRelatedField(read_only=True)
+    option = serializers.IntegerField(source='option_id')
+
     class Meta:
         model = Answer
         fields = ['id', 'challenge', 'option']
 
     def validate(self, attrs):
-        challenge = attrs.get('challenge')
-        option = attrs.get('option')
+        challenge = self.context['challenge']
+        option_id = attrs['option_id']
 
-        # Ensure the option belongs to the correct challenge's quiz
-        if option.question not in challenge.quiz.questions.all():
+        # Ensure the option is an active option of the challenge's quiz
+        content = quiz_content_cache.get(challenge.quiz)
+        if option_id not in content['options']:
             raise serializers.ValidationError(
                 "The option does not belong to any question in this challenge's quiz.")
 
+        attrs['question_id'] = content['options'][option_id]
+        attrs['is_correct'] = any(
+            option['id'] == option_id and option['is_correct']
+            for question in content['questions']
+            for option in question['options'])
         return attrs
 
 
+class AnswerBatchSerializer(serializers.Serializer):
+    """
+    Answers several questions of the challenge passed in the context.
+    """
+    options = serializers.ListField(child=serializers.IntegerField(),
+                                    allow_empty=False)
+
+    def validate_options(self, option_ids):
+        challenge = self.context['challenge']
+        options = quiz_content_cache.get(challenge.quiz)['options']
+
+        invalid = [pk for pk in option_ids if pk not in options]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Options {invalid} do not belong to any question in this "
+                f"challenge's quiz.")
+
+        question_ids = [options[pk] for pk in option_ids]
+        if len(set(question_ids)) != len(question_ids):
+            raise serializers.ValidationError(
+                "Only one option can be given per question.")
+
+        return [(options[pk], pk) for pk in option_ids]
+
+    def create(self, validated_data):
+        """
+        Insert or replace the answers and return the result per question.
+        """
+        challenge = self.context['challenge']
+        selected = dict(validated_data['options'])
+        correct_options = {
+            option['id']
+            for question in quiz_content_cache.get(challenge.quiz)['questions']
+            for option in question['options'] if option['is_correct']}
+        with transaction.atomic():
+            # Lock the challenge so concurrent answers to it are serialized
+            Challenge.objects.select_for_update().only('pk').get(
+                pk=challenge.pk)
+            existing = {}
+            score_delta = 0
+            for question_id, option_id, is_correct in Answer.objects.filter(
+                    challenge=challenge, question_id__in=selected
+            ).values_list('question_id', 'option_id', 'option__is_correct'):
+                existing[question_id] = option_id
+                score_delta -= is_correct
+            replaced = [question_id for question_id, option_id
+                        in existing.items()
+                        if selected[question_id] != option_id]
+            Answer.objects.bulk_create(
+                [Answer(challenge=challenge, question_id=question_id,
+                        option_id=option_id)
+                 for question_id, option_id in selected.items()
+                 if existing.get(question_id) != option_id],
+                update_conflicts=True,
+                unique_fields=['challenge', 'question'],
+                update_fields=['option', 'updated_on'])
+            score_delta += sum(option_id in correct_options
+                               for option_id in selected.values())
+            add_to_running_score(challenge.id, score_delta)
+            record_picks(
+                challenge.quiz_id,
+                [option_id for question_id, option_id in selected.items()
+                 if existing.get(question_id) != option_id],
+                [existing[question_id] for question_id in replaced])
+
+        results = []
+        for question_id, option_id in selected.items():
+            if question_id not in existing:
+                result = 'created'
+            elif question_id in replaced:
+                result = 'replaced'
+            else:
+                result = 'unchanged'
+            results.append({'question': question_id, 'option': option_id,
+                            'result': result})
+        return results
+
+
 class OptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Option
@@ -246,48 +613,81 @@ class OptionSerializer(serializers.ModelSerializer):
 
 
 class QuestionSerializer(serializers.ModelSerializer):
+    """
+    Shape of the questions in ChallengeDetailSerializer, which are built
+    from quiz_content_cache instead of model instances.
+    """
     options = OptionSerializer(many=True, read_only=True)
-    user_answered = serializers.SerializerMethodField()
-    user_option = serializers.SerializerMethodField()
+    user_answered = serializers.BooleanField(read_only=True)
+    user_option = serializers.IntegerField(read_only=True, allow_null=True)
 
     class Meta:
         model = Question
         fields = ['id', 'question_text', 'options', 'user_answered',
                   'user_option']
 
-    def get_user_answered(self, obj):
-        request = self.context.get('request')
-        if request:
-            user_profile = request.user.user
-            # Check if the user has answered this question in the 
-            # context of the challenge
-            return obj.options.filter(answer__challenge__user=user_profile).exists()
-        return False
-
-    def get_user_option(self, obj):
-        request = self.context.get('request')
-        if request:
-            user_profile = request.user.user
-            # Get the user's selected option for this question in the 
-            # context of the challenge
-            try:
-                answer = Answer.objects.get(challenge__user=user_profile,
-                                            option__question=obj)
-                return answer.option.id
-            except Answer.DoesNotExist:
-                return None
-        return None
+
+class ChallengeDetailListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        challenges = data.all() if isinstance(data, models.Manager) else data
+        if 'questions' not in self.child.fields:
+            return super().to_representation(challenges)
+        # Fetch the content of every quiz on the page in one cache lookup
+        quizzes = {challenge.quiz_id: challenge.quiz
+                   for challenge in challenges}
+        self.context['quiz_content'] = quiz_content_cache.get_many(
+            quizzes.values())
+        return super().to_representation(challenges)
 
 
-class ChallengeDetailSerializer(serializers.ModelSerializer):
+class ChallengeDetailSerializer(SparseFieldsetMixin,
+                                serializers.ModelSerializer):
     quiz = serializers.PrimaryKeyRelatedField(read_only=True)
-    questions = QuestionSerializer(many=True, source='quiz.questions.all',
-                                   read_only=True)
+    questions = serializers.SerializerMethodField()
 
     class Meta:
         model = Challenge
         fields = ['id', 'quiz', 'is_accepted', 'is_finished',
                   'no_of_correct_answers', 'questions', 'finished_on']
+        list_serializer_class = ChallengeDetailListSerializer
+        field_requirements = {
+            'questions': {'only': ['quiz'], 'prefetch': ['user_answers']},
+        }
+
+    @extend_schema_field(QuestionSerializer(many=True))
+    def get_questions(self, obj):
+        content = self.context.get('quiz_content', {}).get(obj.quiz_id)
+        if content is None:
+            content = quiz_content_cache.get(obj.quiz)
+        # Scope the answered/selected flags to this challenge only
+        answer_map = obj.get_answer_map()
+        return [{**question,
+                 'user_answered': question['id'] in answer_map,
+                 'user_option': answer_map.get(question['id'])}
+                for question in content['questions']]
+
+
+class ChallengeSummarySerializer(SparseFieldsetMixin,
+                                 serializers.ModelSerializer):
+    quiz_title = serializers.CharField(source='quiz.title', read_only=True)
+    status = serializers.SerializerMethodField()
+    number_of_questions = serializers.IntegerField(
+        source='quiz.number_of_questions', read_only=True)
+
+    class Meta:
+        model = Challenge
+        fields = ['id', 'quiz', 'quiz_title', 'status', 'no_of_correct_answers',
+                  'number_of_questions', 'created_on', 'finished_on']
+        field_requirements = {
+            'status': {'only': ['is_finished', 'is_accepted']},
+        }
+
+    def get_status(self, obj):
+        if obj.is_finished:
+            return 'finished'
+        if obj.is_accepted:
+            return 'accepted'
+        return 'pending'
 
 
 class UserAnswerSerializer(serializers.ModelSerializer):
@@ -306,7 +706,69 @@ class FinishChallengeSerializer(serializers.ModelSerializer):
                             'finished_on']
 
 
-class ChallengeListSerializer(serializers.ModelSerializer):
+class ChallengeListSerializer(SparseFieldsetMixin,
+                              serializers.ModelSerializer):
+    class Meta:
+        model = Challenge
+        fields = '__all__'
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
+    username = serializers.CharField(source='user.user.username',
+                                     read_only=True)
+    score = serializers.IntegerField(source='no_of_correct_answers',
+                                     read_only=True)
+
     class Meta:
         model = Challenge
-        fields = '__all__'
\ No newline at end of file
+        fields = ['rank', 'id', 'user_id', 'username', 'score', 'finished_on']
+
+
+class QuizContentCacheStatsSerializer(serializers.Serializer):
+    """
+    Shape of quiz.cache.QuizContentCache.stats.
+    """
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    invalidations = serializers.IntegerField()
+    hit_rate = serializers.FloatField(allow_null=True)
+
+
+class ProfileSerializer(serializers.Serializer):
+    """
+    Shape of the entries of quiz.profiling.list_profiles.
+    """
+    name = serializers.CharField()
+    view = serializers.CharField()
+    format = serializers.ChoiceField(choices=['collapsed', 'pstats'])
+    size = serializers.IntegerField()
+    created_on = serializers.DateTimeField()
+
+
+class OptionPicksSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    option_text = serializers.CharField()
+    is_correct = serializers.BooleanField()
+    is_active = serializers.BooleanField()
+    picks = serializers.IntegerField()
+
+
+class QuestionAnswerStatsSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    question_text = serializers.CharField()
+    answers = serializers.IntegerField()
+    percent_correct = serializers.FloatField(allow_null=True)
+    options = OptionPicksSerializer(many=True)
+
+
+class QuizAnswerStatsSerializer(serializers.Serializer):
+    """
+    Shape of quiz.analytics.quiz_answer_stats.
+    """
+    quiz = serializers.IntegerField()
+    number_of_challenges = serializers.IntegerField()
+    number_of_finished_challenges = serializers.IntegerField()
+    average_score = serializers.FloatField(allow_null=True)
+    questions = QuestionAnswerStatsSerializer(many=True)
@@ -0,0 +1,134 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from quiz.authentication import token_cache
+from quiz.cache import quiz_content_cache
+from quiz.models import UserProfile, Question, Option, Quiz, Challenge
+from quiz.scoring import record_finished_score
+
+
+def refresh_quiz_counters(quizzes=None):
+    """
+    Recompute the denormalized question/challenge counters of the given
+    quizzes (all quizzes by default) with a single UPDATE statement.
+    """
+    if quizzes is None:
+        quizzes = Quiz.objects.all()
+    question_counts = Quiz.questions.through.objects.filter(
+        quiz=OuterRef('pk')).values('quiz').annotate(
+        count=Count('pk')).values('count')
+    challenge_counts = Challenge.objects.filter(
+        quiz=OuterRef('pk')).values('quiz').annotate(
+        count=Count('pk')).values('count')
+    return quizzes.update(
+        number_of_questions=Coalesce(Subquery(question_counts), 0),
+        number_of_challenges=Coalesce(Subquery(challenge_counts), 0))
+
+
+@receiver(m2m_changed, sender=Quiz.questions.through)
+def update_quiz_questions(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_quiz_ids = list(
+            instance.quizzes.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        quizzes = Quiz.objects.filter(pk=instance.pk)
+    elif action == 'post_clear':
+        quizzes = Quiz.objects.filter(
+            pk__in=instance.__dict__.pop('_cleared_quiz_ids', []))
+    else:
+        quizzes = Quiz.objects.filter(pk__in=pk_set)
+
+    if action == 'post_add':
+        # pk_set only holds the rows that were actually inserted
+        increment = 1 if reverse else len(pk_set)
+        quizzes.update(
+            number_of_questions=F('number_of_questions') + increment)
+    else:
+        # pk_set may name rows that were never linked, so recount instead
+        refresh_quiz_counters(quizzes)
+    quiz_content_cache.invalidate(quizzes)
+
+
+@receiver(post_save, sender=Question)
+def invalidate_quiz_content_on_question_save(sender, instance, created,
+                                             **kwargs):
+    if not created:
+        quiz_content_cache.invalidate_questions([instance.pk])
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def invalidate_quiz_content_on_option_change(sender, instance, **kwargs):
+    quiz_content_cache.invalidate_questions([instance.question_id])
+
+
+@receiver(pre_delete, sender=Question)
+def remember_question_quizzes(sender, instance, **kwargs):
+    # The M2M rows are removed by the delete cascade without m2m_changed
+    instance._deleted_from_quiz_ids = list(
+        instance.quizzes.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Question)
+def update_quizzes_of_deleted_question(sender, instance, **kwargs):
+    quiz_ids = instance.__dict__.pop('_deleted_from_quiz_ids', [])
+    if quiz_ids:
+        refresh_quiz_counters(Quiz.objects.filter(pk__in=quiz_ids))
+        quiz_content_cache.invalidate(Quiz.objects.filter(pk__in=quiz_ids))
+
+
+@receiver(post_save, sender=Challenge)
+def increment_challenge_counter(sender, instance, created, **kwargs):
+    if created:
+        Quiz.objects.filter(pk=instance.quiz_id).update(
+            number_of_challenges=F('number_of_challenges') + 1,
+            updated_on=timezone.now())
+
+
+@receiver(post_delete, sender=Challenge)
+def decrement_challenge_counter(sender, instance, **kwargs):
+    Quiz.objects.filter(pk=instance.quiz_id).update(
+        number_of_challenges=F('number_of_challenges') - 1,
+        updated_on=timezone.now())
+
+
+@receiver(post_save, sender=Challenge)
+def count_score_of_created_challenge(sender, instance, created, **kwargs):
+    # Challenges are finished by FinishChallengeView, which counts the
+    # score itself; this covers challenges created already finished
+    if created and instance.is_finished:
+        record_finished_score(instance.quiz_id, instance.no_of_correct_answers)
+
+
+@receiver(post_delete, sender=Challenge)
+def uncount_score_of_deleted_challenge(sender, instance, **kwargs):
+    if instance.is_finished:
+        record_finished_score(instance.quiz_id,
+                              instance.no_of_correct_answers, -1)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_tokens(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile_tokens(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.user_id)
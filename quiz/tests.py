@@ -1,8 +1,32 @@
+import json
+import os
+import pstats
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest import mock, skipUnless
+from django.test import override_settings
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.utils import timezone
+from rest_framework.test import (APIRequestFactory, APITestCase,
+                                 force_authenticate)
 from rest_framework import status
+from rest_framework.request import Request
 from django.contrib.auth.models import User
-from quiz.models import UserProfile, Question, Option
+from rest_framework.authtoken.models import Token
+from oper.database import parse_database_url
+from quiz.authentication import token_cache
+from quiz.pagination import KeysetPagination
+from quiz.routers import ReplicaRouter, is_pinned_to_primary, read_from
+from quiz.scoring import find_inconsistent_scores
+from quiz.serializers import BulkChallengeSerializer, ChallengeListSerializer
+from quiz.views import common_views, creator_views, user_views
+from quiz.models import (UserProfile, Question, Option, Quiz, Challenge,
+                         Answer, OptionPickCount, ScoreCount)
 
 class AddQuestionViewTest(APITestCase):
     def setUp(self):
@@ -91,3 +115,1062 @@ class AddQuestionViewTest(APITestCase):
 
         # Check the error message
         self.assertIn('Exactly one option must be marked as correct.', str(response.data))
+
+
+class ChallengeTestMixin:
+    def setUp(self):
+        # Ids are reused across rolled back tests, so are cache keys
+        cache.clear()
+        creator = User.objects.create_user(username='creator', password='creator')
+        self.creator_profile = UserProfile.objects.create(user=creator, is_creator=True)
+        self.user = User.objects.create_user(username='participant', password='participant')
+        self.user_profile = UserProfile.objects.create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def create_challenge(self, number_of_questions):
+        quiz = Quiz.objects.create(title=f'Quiz {number_of_questions}',
+                                   description='quiz',
+                                   user=self.creator_profile)
+        for i in range(number_of_questions):
+            question = Question.objects.create(
+                question_text=f'Question {number_of_questions}-{i}',
+                created_by=self.creator_profile)
+            Option.objects.create(question=question, option_text='Right', is_correct=True)
+            Option.objects.create(question=question, option_text='Wrong')
+            quiz.questions.add(question)
+        return Challenge.objects.create(user=self.user_profile, quiz=quiz,
+                                        is_accepted=True)
+
+
+class ChallengeDetailViewTest(ChallengeTestMixin, APITestCase):
+    def get_detail(self, challenge):
+        url = reverse('challenge-detail', kwargs={'pk': challenge.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_questions(self):
+        _, small_count = self.get_detail(self.create_challenge(2))
+        _, large_count = self.get_detail(self.create_challenge(25))
+        self.assertEqual(small_count, large_count)
+
+    def test_answers_are_scoped_to_the_challenge(self):
+        challenge = self.create_challenge(2)
+        first, second = challenge.quiz.questions.order_by('id')
+        option = first.options.get(is_correct=True)
+        Answer.objects.create(challenge=challenge, option=option)
+
+        # The same question answered in another challenge must not leak
+        other_quiz = Quiz.objects.create(title='Other', description='quiz',
+                                         user=self.creator_profile)
+        other_quiz.questions.add(second)
+        other_challenge = Challenge.objects.create(user=self.user_profile,
+                                                   quiz=other_quiz)
+        Answer.objects.create(challenge=other_challenge,
+                              option=second.options.first())
+
+        response, _ = self.get_detail(challenge)
+        questions = {q['id']: q for q in response.data['questions']}
+        self.assertTrue(questions[first.id]['user_answered'])
+        self.assertEqual(questions[first.id]['user_option'], option.id)
+        self.assertFalse(questions[second.id]['user_answered'])
+        self.assertIsNone(questions[second.id]['user_option'])
+
+    def test_inactive_options_are_hidden(self):
+        challenge = self.create_challenge(1)
+        question = challenge.quiz.questions.get()
+        question.options.filter(is_correct=False).update(is_active=False)
+
+        response, _ = self.get_detail(challenge)
+        self.assertEqual(len(response.data['questions'][0]['options']), 1)
+
+
+class ChallengeListViewTest(ChallengeTestMixin, APITestCase):
+    url = reverse('challenge-list')
+
+    def test_summary_pages_follow_the_cursor(self):
+        challenges = [self.create_challenge(n) for n in range(1, 6)]
+
+        seen = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual([c['id'] for c in seen],
+                         [c.id for c in reversed(challenges)])
+        self.assertEqual(seen[0]['number_of_questions'], 5)
+        self.assertEqual(seen[0]['status'], 'accepted')
+        self.assertNotIn('questions', seen[0])
+
+    def test_expand_questions(self):
+        self.create_challenge(2)
+        response = self.client.get(f'{self.url}?expand=questions')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results'][0]['questions']), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.url}?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_count_is_only_run_on_request(self):
+        for n in range(1, 4):
+            self.create_challenge(n)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.url}?page_size=2')
+        self.assertNotIn('count', response.data)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in queries))
+
+        response = self.client.get(f'{self.url}?page_size=2&count=true')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_page_size_is_capped(self):
+        self.create_challenge(1)
+        paginator = KeysetPagination()
+        request = APIRequestFactory().get('/', {'page_size': 1000})
+        self.assertEqual(paginator.get_page_size(Request(request)),
+                         paginator.max_page_size)
+
+
+class QuizCountersTest(ChallengeTestMixin, APITestCase):
+    def test_counters_follow_questions_and_challenges(self):
+        challenge = self.create_challenge(3)
+        quiz = Quiz.objects.get(pk=challenge.quiz_id)
+        self.assertEqual(quiz.number_of_questions, 3)
+        self.assertEqual(quiz.number_of_challenges, 1)
+
+        question = quiz.questions.first()
+        quiz.questions.remove(question)
+        question.quizzes.add(quiz)
+        question.quizzes.clear()
+        challenge.delete()
+        quiz.refresh_from_db()
+        self.assertEqual(quiz.number_of_questions, 2)
+        self.assertEqual(quiz.number_of_challenges, 0)
+
+    def test_quiz_list_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.creator_profile.user)
+        url = reverse('quiz-list')
+        self.create_challenge(1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for n in range(2, 6):
+            self.create_challenge(n)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual([q['number_of_questions'] for q in response.data['results']],
+                         [5, 4, 3, 2, 1])
+
+
+class BulkQuestionImportViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.user_profile = UserProfile.objects.create(user=self.user, is_creator=True)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('bulk-question-import')
+        Question.objects.create(question_text='Existing', created_by=self.user_profile)
+
+    def question(self, text, correct=(True, False)):
+        return {'question_text': text,
+                'options': [{'option_text': f'Option {i}', 'is_correct': c}
+                            for i, c in enumerate(correct)]}
+
+    def test_import_reports_per_item_errors(self):
+        data = [
+            self.question('First'),
+            self.question('Existing'),
+            self.question('Second', correct=(True, True)),
+            self.question('First'),
+            self.question('Third', correct=(False, True, False)),
+        ]
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 2, 3])
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertEqual(Option.objects.filter(question__question_text='Third').count(), 3)
+
+    def test_import_rejects_a_single_object(self):
+        response = self.client.post(self.url, self.question('Single'), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Expected a list of questions.')
+        self.assertFalse(Question.objects.filter(question_text='Single').exists())
+
+    def test_import_ndjson_stream(self):
+        lines = [json.dumps(self.question(f'Question {i}')) for i in range(5)]
+        lines.insert(2, '{not json')
+        body = '\n'.join(lines) + '\n'
+
+        response = self.client.post(self.url, body,
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual([e['index'] for e in response.data['errors']], [2])
+
+
+class EditQuestionViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.user_profile = UserProfile.objects.create(user=self.user, is_creator=True)
+        self.client.force_authenticate(user=self.user)
+        self.question = self.create_question('Capital of France?', 'Paris', 'London', 'Rome')
+
+    def create_question(self, text, *option_texts):
+        question = Question.objects.create(question_text=text, created_by=self.user_profile)
+        for i, option_text in enumerate(option_texts):
+            Option.objects.create(question=question, option_text=option_text,
+                                  is_correct=i == 0)
+        return question
+
+    def options_payload(self, question):
+        return [{'id': o.id, 'option_text': o.option_text, 'is_correct': o.is_correct}
+                for o in question.options.order_by('id')]
+
+    def test_only_changed_options_are_written(self):
+        paris, london, rome = self.question.options.order_by('id')
+        untouched_on = paris.updated_on
+        options = self.options_payload(self.question)
+        options[1]['option_text'] = 'Berlin'
+        del options[2]
+        url = reverse('edit-question', kwargs={'pk': self.question.id})
+
+        response = self.client.patch(url, {'options': options}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for option in (paris, london, rome):
+            option.refresh_from_db()
+        self.assertEqual(paris.updated_on, untouched_on)
+        self.assertEqual(london.option_text, 'Berlin')
+        self.assertGreater(london.updated_on, london.created_on)
+        self.assertFalse(rome.is_active)
+
+        # Re-adding a removed option by text reactivates it
+        options.append({'option_text': 'Rome', 'is_correct': False})
+        self.client.patch(url, {'options': options}, format='json')
+        rome.refresh_from_db()
+        self.assertTrue(rome.is_active)
+        self.assertEqual(self.question.options.count(), 3)
+
+    def test_bulk_edit(self):
+        other = self.create_question('Capital of Spain?', 'Madrid', 'Lisbon')
+        options = self.options_payload(other)
+        options[0]['is_correct'], options[1]['is_correct'] = False, True
+        data = [
+            {'id': self.question.id, 'question_text': 'Capital of France'},
+            {'id': other.id, 'options': options},
+        ]
+
+        response = self.client.patch(reverse('bulk-edit-question'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.question_text, 'Capital of France')
+        self.assertEqual(other.options.get(is_correct=True).option_text, 'Lisbon')
+
+    def test_bulk_edit_rejects_duplicate_questions(self):
+        options = [{'option_text': 'Paris', 'is_correct': True},
+                   {'option_text': 'Lyon', 'is_correct': False}]
+        data = [{'id': self.question.id, 'options': options},
+                {'id': self.question.id, 'options': options}]
+        response = self.client.patch(reverse('bulk-edit-question'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.question.options.filter(option_text='Lyon').exists())
+
+    def test_bulk_edit_rejects_unknown_questions(self):
+        data = [{'id': 0, 'question_text': 'Unknown'}]
+        response = self.client.patch(reverse('bulk-edit-question'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AnswerBatchViewTest(ChallengeTestMixin, APITestCase):
+    def test_batch_creates_and_replaces_answers(self):
+        challenge = self.create_challenge(3)
+        first, second, third = challenge.quiz.questions.order_by('id')
+        Answer.objects.create(challenge=challenge, option=first.options.get(is_correct=True))
+        Answer.objects.create(challenge=challenge, option=second.options.get(is_correct=True))
+        option_ids = [first.options.get(is_correct=True).id,
+                      second.options.get(is_correct=False).id,
+                      third.options.get(is_correct=True).id]
+        url = reverse('answer-quiz-batch', kwargs={'challenge_id': challenge.id})
+
+        response = self.client.post(url, {'options': option_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['result'] for a in response.data['answers']],
+                         ['unchanged', 'replaced', 'created'])
+        self.assertEqual(sorted(challenge.user_answers.values_list('option_id', flat=True)),
+                         sorted(option_ids))
+
+    def test_batch_rejects_foreign_options(self):
+        challenge = self.create_challenge(1)
+        other = self.create_challenge(2)
+        foreign = other.quiz.questions.first().options.first()
+        url = reverse('answer-quiz-batch', kwargs={'challenge_id': challenge.id})
+
+        response = self.client.post(url, {'options': [foreign.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(challenge.user_answers.exists())
+
+
+class AnswerQuizViewTest(ChallengeTestMixin, APITestCase):
+    def answer(self, challenge, option):
+        url = reverse('answer-quiz', kwargs={'challenge_id': challenge.id})
+        data = {'option': option.id}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format='json')
+        return response, len(queries)
+
+    def test_validation_cost_does_not_grow_with_quiz_size(self):
+        small = self.create_challenge(1)
+        large = self.create_challenge(30)
+        _, small_count = self.answer(small, small.quiz.questions.first().options.first())
+        _, large_count = self.answer(large, large.quiz.questions.last().options.first())
+        self.assertEqual(small_count, large_count)
+
+    def test_counted_option_is_answered_without_creating_its_counter(self):
+        first = self.create_challenge(1)
+        option, other = first.quiz.questions.first().options.order_by('id')
+        user = User.objects.create_user(username='second', password='second')
+        second = Challenge.objects.create(
+            user=UserProfile.objects.create(user=user), quiz=first.quiz,
+            is_accepted=True)
+
+        self.answer(first, other)
+        _, uncounted = self.answer(first, option)
+        self.client.force_authenticate(user=user)
+        response, counted = self.answer(second, option)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(counted, uncounted - 1)
+        self.assertEqual(OptionPickCount.objects.get(option=option).count, 2)
+
+    def test_rejects_option_from_another_quiz(self):
+        challenge = self.create_challenge(1)
+        other = self.create_challenge(2)
+        response, _ = self.answer(challenge, other.quiz.questions.first().options.first())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_answer_is_stored_on_the_challenge_in_the_url(self):
+        challenge = self.create_challenge(1)
+        other = self.create_challenge(2)
+        option = challenge.quiz.questions.first().options.get(is_correct=True)
+        foreign = other.quiz.questions.first().options.get(is_correct=True)
+        url = reverse('answer-quiz', kwargs={'challenge_id': challenge.id})
+
+        response = self.client.post(url, {'challenge': other.id, 'option': foreign.id},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Answer.objects.exists())
+
+        response = self.client.post(url, {'challenge': other.id, 'option': option.id},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['challenge'], challenge.id)
+        self.assertEqual(Answer.objects.get().challenge_id, challenge.id)
+        other.refresh_from_db()
+        self.assertEqual(other.running_score, 0)
+
+    def test_changing_option_replaces_the_answer_in_place(self):
+        challenge = self.create_challenge(1)
+        right, wrong = challenge.quiz.questions.first().options.order_by('id')
+        self.answer(challenge, right)
+        first = Answer.objects.get(challenge=challenge)
+
+        response, _ = self.answer(challenge, wrong)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        answer = Answer.objects.get(challenge=challenge)
+        self.assertEqual((answer.id, answer.option_id, answer.question_id),
+                         (first.id, wrong.id, wrong.question_id))
+        challenge.refresh_from_db()
+        self.assertEqual(challenge.running_score, 0)
+
+
+class QuizContentCacheTest(ChallengeTestMixin, APITestCase):
+    def test_edits_invalidate_cached_content(self):
+        challenge = self.create_challenge(2)
+        url = reverse('challenge-detail', kwargs={'pk': challenge.id})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get(url)
+        self.assertFalse(any('quiz_question' in q['sql'] for q in cached))
+
+        question = challenge.quiz.questions.order_by('id').first()
+        options = [{'id': o.id, 'option_text': o.option_text + '!', 'is_correct': o.is_correct}
+                   for o in question.options.all()]
+        self.client.force_authenticate(user=self.creator_profile.user)
+        self.client.patch(reverse('edit-question', kwargs={'pk': question.id}),
+                          {'options': options}, format='json')
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        texts = [o['option_text'] for o in response.data['questions'][0]['options']]
+        self.assertEqual(texts, ['Right!', 'Wrong!'])
+
+
+class BulkAssignChallengeViewTest(ChallengeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.creator_profile.user)
+        self.url = reverse('bulk-assign-challenge')
+        self.participants = [
+            UserProfile.objects.create(
+                user=User.objects.create_user(username=f'cohort-{i}'))
+            for i in range(3)]
+
+    def test_assign_by_ids_skips_existing(self):
+        challenge = self.create_challenge(1)
+        Challenge.objects.create(user=self.participants[0], quiz=challenge.quiz)
+        ids = [p.id for p in self.participants]
+
+        response = self.client.post(self.url, {'quiz_id': challenge.quiz_id, 'user_ids': ids},
+                                    format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 2, 'skipped': 1})
+        challenge.quiz.refresh_from_db()
+        self.assertEqual(challenge.quiz.number_of_challenges, 4)
+
+    def test_counts_existing_challenges_of_the_requested_ids_in_batches(self):
+        challenge = self.create_challenge(1)
+        Challenge.objects.create(user=self.participants[2], quiz=challenge.quiz)
+        ids = [p.id for p in self.participants]
+
+        with mock.patch.object(BulkChallengeSerializer, 'batch_size', 2), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, {'quiz_id': challenge.quiz_id, 'user_ids': ids},
+                format='json')
+
+        self.assertEqual(response.data, {'created': 2, 'skipped': 1})
+        counts = [query['sql'] for query in queries
+                  if query['sql'].startswith('SELECT COUNT(*)')]
+        self.assertEqual(len(counts), 2)
+        self.assertTrue(all('"user_id" IN' in sql for sql in counts))
+
+    def test_assign_by_filter(self):
+        quiz = self.create_challenge(1).quiz
+        response = self.client.post(
+            self.url, {'quiz_id': quiz.id, 'filter': {'username_prefix': 'cohort-'}},
+            format='json')
+        self.assertEqual(response.data, {'created': 3, 'skipped': 0})
+
+    def test_rejects_creators(self):
+        quiz = self.create_challenge(1).quiz
+        response = self.client.post(
+            self.url, {'quiz_id': quiz.id, 'user_ids': [self.creator_profile.id]},
+            format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Challenge.objects.filter(user=self.creator_profile).exists())
+
+
+class DatabaseSettingsTest(APITestCase):
+    def test_parse_sqlite_url(self):
+        config = parse_database_url('sqlite:////var/db/quiz.sqlite3', conn_max_age=60)
+        self.assertEqual((config['ENGINE'], config['NAME'], config['CONN_MAX_AGE']),
+                         ('oper.sqlite3', '/var/db/quiz.sqlite3', 60))
+
+    def test_parse_postgres_url(self):
+        config = parse_database_url('postgres://quiz:p%40ss@db:5432/quiz?sslmode=require')
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((config['USER'], config['PASSWORD'], config['HOST'], config['PORT']),
+                         ('quiz', 'p@ss', 'db', 5432))
+        self.assertEqual(config['OPTIONS'], {'sslmode': 'require'})
+
+    def test_rejects_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            parse_database_url('mysql://db/quiz')
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite only')
+    def test_sqlite_connections_apply_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class CachedTokenAuthenticationTest(ChallengeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=None)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.url = reverse('challenge-list')
+
+    def test_repeated_requests_skip_auth_queries(self):
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(self.url)
+        self.assertEqual(len(first) - len(second), 1)
+
+    def test_profile_change_invalidates_cache(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.user_profile.is_creator = True
+        self.user_profile.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cache_holds_ids_and_flags_only(self):
+        self.client.get(self.url)
+        token = Token.objects.get(user=self.user)
+        entry = cache.get(token_cache.get_key(token.key))
+        self.assertNotIn(self.user.password, str(entry))
+
+        cached = token_cache.get(Token, token.key)
+        self.assertEqual((cached.user.pk, cached.user.user.pk),
+                         (self.user.pk, self.user_profile.pk))
+        self.assertIsNot(cached.user, token_cache.get(Token, token.key).user)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        Token.objects.filter(user=self.user).delete()
+        self.assertEqual(self.client.get(self.url).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+
+class ScoringTest(ChallengeTestMixin, APITestCase):
+    def test_running_score_follows_answers(self):
+        challenge = self.create_challenge(3)
+        first, second, third = challenge.quiz.questions.order_by('id')
+        answer_url = reverse('answer-quiz', kwargs={'challenge_id': challenge.id})
+        for option in (first.options.get(is_correct=True),
+                       second.options.get(is_correct=True),
+                       second.options.get(is_correct=False)):
+            self.client.post(answer_url, {'challenge': challenge.id, 'option': option.id},
+                             format='json')
+        self.client.post(reverse('answer-quiz-batch', kwargs={'challenge_id': challenge.id}),
+                         {'options': [first.options.get(is_correct=False).id,
+                                      third.options.get(is_correct=True).id]},
+                         format='json')
+        challenge.refresh_from_db()
+        self.assertEqual(challenge.running_score, 1)
+
+        response = self.client.patch(reverse('finish-challenge', kwargs={'pk': challenge.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        challenge.refresh_from_db()
+        self.assertTrue(challenge.is_finished)
+        self.assertEqual(challenge.no_of_correct_answers, 1)
+        self.assertFalse(find_inconsistent_scores().exists())
+
+        response = self.client.patch(reverse('finish-challenge', kwargs={'pk': challenge.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_check_command_fixes_scores(self):
+        challenge = self.create_challenge(1)
+        Answer.objects.create(challenge=challenge,
+                              option=challenge.quiz.questions.get().options.get(is_correct=True))
+        out = StringIO()
+        call_command('check_challenge_scores', '--fix', stdout=out)
+        self.assertIn('Fixed 1 challenges.', out.getvalue())
+        challenge.refresh_from_db()
+        self.assertEqual(challenge.running_score, 1)
+
+
+@override_settings(RESCORE_IN_BACKGROUND=False)
+class RescoringTest(ChallengeTestMixin, APITestCase):
+    def test_flipping_correct_option_rescores_challenges(self):
+        challenge = self.create_challenge(2)
+        question = challenge.quiz.questions.order_by('id').first()
+        wrong = question.options.get(is_correct=False)
+        Answer.objects.create(challenge=challenge, option=wrong)
+        Challenge.objects.filter(pk=challenge.pk).update(
+            is_finished=True, no_of_correct_answers=0)
+        options = [{'id': o.id, 'option_text': o.option_text, 'is_correct': o.id == wrong.id}
+                   for o in question.options.all()]
+        self.client.force_authenticate(user=self.creator_profile.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('edit-question', kwargs={'pk': question.id}),
+                              {'options': options}, format='json')
+
+        challenge.refresh_from_db()
+        self.assertEqual(challenge.no_of_correct_answers, 1)
+        self.assertEqual(challenge.running_score, 1)
+
+
+class QuizLeaderboardViewTest(ChallengeTestMixin, APITestCase):
+    def test_ranks_by_score_then_finish_time(self):
+        quiz = self.create_challenge(3).quiz
+        now = timezone.now()
+        results = [('a', 2, 3), ('b', 3, 5), ('c', 2, 1), ('d', None, None)]
+        for username, score, minutes in results:
+            profile = UserProfile.objects.create(user=User.objects.create_user(username=username))
+            Challenge.objects.create(
+                user=profile, quiz=quiz, is_finished=score is not None,
+                no_of_correct_answers=score,
+                finished_on=now + timedelta(minutes=minutes) if minutes else None)
+        self.client.force_authenticate(user=User.objects.get(username='a'))
+
+        response = self.client.get(
+            reverse('quiz-leaderboard', kwargs={'quiz_id': quiz.id}) + '?limit=2')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(e['rank'], e['username']) for e in response.data['results']],
+                         [(1, 'b'), (2, 'c')])
+        self.assertEqual(response.data['me']['rank'], 3)
+
+    @override_settings(RESCORE_IN_BACKGROUND=False)
+    def test_score_counts_follow_finishing_and_rescoring(self):
+        challenge = self.create_challenge(2)
+        quiz = challenge.quiz
+        rival = Challenge.objects.create(
+            user=UserProfile.objects.create(user=User.objects.create_user(username='rival')),
+            quiz=quiz, is_finished=True, no_of_correct_answers=1,
+            finished_on=timezone.now())
+        question = quiz.questions.order_by('id').first()
+        right = question.options.get(is_correct=True)
+        self.client.post(reverse('answer-quiz', kwargs={'challenge_id': challenge.id}),
+                         {'challenge': challenge.id, 'option': right.id}, format='json')
+        self.client.patch(reverse('finish-challenge', kwargs={'pk': challenge.id}))
+
+        counts = dict(ScoreCount.objects.filter(quiz=quiz).values_list('score', 'count'))
+        self.assertEqual(counts, {1: 2})
+        challenge.refresh_from_db()
+        self.assertEqual(Challenge.objects.rank_of(rival), 1)
+        self.assertEqual(Challenge.objects.rank_of(challenge), 2)
+
+        # Making the other option correct drops the participant to 0
+        options = [{'id': o.id, 'option_text': o.option_text, 'is_correct': o.id != right.id}
+                   for o in question.options.all()]
+        self.client.force_authenticate(user=self.creator_profile.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('edit-question', kwargs={'pk': question.id}),
+                              {'options': options}, format='json')
+
+        counts = dict(ScoreCount.objects.filter(quiz=quiz).values_list('score', 'count'))
+        self.assertEqual(counts, {0: 1, 1: 1})
+        challenge.refresh_from_db()
+        self.assertEqual(Challenge.objects.rank_of(challenge), 2)
+        rival.delete()
+        self.assertEqual(Challenge.objects.rank_of(challenge), 1)
+
+    def test_outsiders_are_rejected(self):
+        quiz = self.create_challenge(1).quiz
+        outsider = User.objects.create_user(username='outsider')
+        UserProfile.objects.create(user=outsider)
+        self.client.force_authenticate(user=outsider)
+        response = self.client.get(reverse('quiz-leaderboard', kwargs={'quiz_id': quiz.id}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class QuizAnalyticsViewTest(ChallengeTestMixin, APITestCase):
+    def test_pick_counts_follow_answers(self):
+        challenge = self.create_challenge(2)
+        first, second = challenge.quiz.questions.order_by('id')
+        right, wrong = first.options.get(is_correct=True), first.options.get(is_correct=False)
+        answer_url = reverse('answer-quiz', kwargs={'challenge_id': challenge.id})
+        for option in (wrong, right):
+            self.client.post(answer_url, {'challenge': challenge.id, 'option': option.id},
+                             format='json')
+        self.client.post(reverse('answer-quiz-batch', kwargs={'challenge_id': challenge.id}),
+                         {'options': [second.options.get(is_correct=False).id]}, format='json')
+
+        self.client.force_authenticate(user=self.creator_profile.user)
+        response = self.client.get(reverse('quiz-analytics', kwargs={'quiz_id': challenge.quiz_id}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        questions = {q['id']: q for q in response.data['questions']}
+        picks = {o['id']: o['picks'] for o in questions[first.id]['options']}
+        self.assertEqual(picks, {right.id: 1, wrong.id: 0})
+        self.assertEqual(questions[first.id]['percent_correct'], 100)
+        self.assertEqual(questions[second.id]['percent_correct'], 0)
+        # Nobody finished yet
+        self.assertIsNone(response.data['average_score'])
+
+        OptionPickCount.objects.all().delete()
+        call_command('rebuild_answer_stats', stdout=StringIO())
+        self.assertEqual(OptionPickCount.objects.get(option=right).count, 1)
+
+    def test_average_score_is_over_finished_challenges(self):
+        challenge = self.create_challenge(2)
+        quiz = challenge.quiz
+        for i in range(9):
+            Challenge.objects.create(
+                user=UserProfile.objects.create(
+                    user=User.objects.create_user(username=f'assigned-{i}')),
+                quiz=quiz)
+        answers_url = reverse('answer-quiz-batch', kwargs={'challenge_id': challenge.id})
+        self.client.post(answers_url, {'options': list(Option.objects.filter(
+            question__quizzes=quiz, is_correct=True).values_list('id', flat=True))},
+            format='json')
+        self.client.patch(reverse('finish-challenge', kwargs={'pk': challenge.id}))
+
+        self.client.force_authenticate(user=self.creator_profile.user)
+        response = self.client.get(reverse('quiz-analytics', kwargs={'quiz_id': quiz.id}))
+
+        self.assertEqual(response.data['number_of_challenges'], 10)
+        self.assertEqual(response.data['number_of_finished_challenges'], 1)
+        self.assertEqual(response.data['average_score'], 2)
+
+
+class ReplicaRoutingTest(ChallengeTestMixin, APITestCase):
+    def read_database(self, method):
+        request = APIRequestFactory().generic(method, '/challenges/')
+        request.user = self.user
+        view = user_views.ChallengeListView()
+        view.request = request
+        return view.get_read_database()
+
+    def test_router_reads_from_the_chosen_database(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Quiz))
+        with read_from('replica'):
+            self.assertEqual(router.db_for_read(Quiz), 'replica')
+            self.assertEqual(router.db_for_write(Quiz), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'quiz'))
+
+    @mock.patch('quiz.routers.replica_alias', return_value='replica')
+    def test_safe_requests_read_from_the_replica(self, _):
+        self.assertEqual(self.read_database('GET'), 'replica')
+        self.assertIsNone(self.read_database('POST'))
+
+    @mock.patch('quiz.routers.replica_alias', return_value='replica')
+    def test_writes_pin_the_user_to_the_primary(self, _):
+        challenge = self.create_challenge(1)
+        option = challenge.quiz.questions.first().options.first()
+        self.client.post(reverse('answer-quiz', kwargs={'challenge_id': challenge.id}),
+                         {'challenge': challenge.id, 'option': option.id}, format='json')
+
+        self.assertTrue(is_pinned_to_primary(self.user))
+        self.assertIsNone(self.read_database('GET'))
+
+
+class ConditionalGetTest(ChallengeTestMixin, APITestCase):
+    def test_challenge_detail_is_not_modified_until_answered(self):
+        challenge = self.create_challenge(2)
+        url = reverse('challenge-detail', kwargs={'pk': challenge.id})
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+
+        option = challenge.quiz.questions.first().options.first()
+        self.client.post(reverse('answer-quiz', kwargs={'challenge_id': challenge.id}),
+                         {'challenge': challenge.id, 'option': option.id}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_challenge_detail_checks_permissions_first(self):
+        challenge = self.create_challenge(1)
+        url = reverse('challenge-detail', kwargs={'pk': challenge.id})
+        etag = self.client.get(url)['ETag']
+
+        outsider = User.objects.create_user(username='outsider')
+        UserProfile.objects.create(user=outsider)
+        self.client.force_authenticate(user=outsider)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_quiz_list_changes_with_challenge_counters(self):
+        challenge = self.create_challenge(1)
+        self.client.force_authenticate(user=self.creator_profile.user)
+        url = reverse('quiz-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        other = User.objects.create_user(username='other')
+        Challenge.objects.create(user=UserProfile.objects.create(user=other),
+                                 quiz=challenge.quiz)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['number_of_challenges'], 2)
+
+    def test_question_list_changes_with_options(self):
+        challenge = self.create_challenge(1)
+        self.client.force_authenticate(user=self.creator_profile.user)
+        url = reverse('question-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        question = challenge.quiz.questions.get()
+        Option.objects.create(question=question, option_text='Maybe')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class QuizChallengesExportTest(ChallengeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.challenge = self.create_challenge(1)
+        for i in range(3):
+            Challenge.objects.create(
+                user=UserProfile.objects.create(
+                    user=User.objects.create_user(username=f'exported-{i}')),
+                quiz=self.challenge.quiz, is_finished=bool(i), no_of_correct_answers=i)
+        self.client.force_authenticate(user=self.creator_profile.user)
+        self.url = reverse('quiz-challenges', kwargs={'quiz_id': self.challenge.quiz_id})
+
+    def export(self, export_format):
+        response = self.client.get(self.url, {'format': export_format})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_rows_match_the_json_list(self):
+        expected = json.loads(json.dumps(self.client.get(self.url).data['results']))
+        rows = [json.loads(line) for line in self.export('ndjson').splitlines()]
+        self.assertEqual(rows, sorted(expected, key=lambda row: row['id']))
+
+    def test_csv_has_a_header_and_a_row_per_challenge(self):
+        lines = self.export('csv').splitlines()
+        self.assertEqual(lines[0].split(','),
+                         list(ChallengeListSerializer().fields))
+        self.assertEqual(len(lines), 5)
+        self.assertIn(',true,2,', lines[-1])
+
+    def test_export_requires_the_quiz_owner(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SparseFieldsetTest(ChallengeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.challenge = self.create_challenge(2)
+
+    def test_challenge_detail_skips_the_question_tree(self):
+        url = reverse('challenge-detail', kwargs={'pk': self.challenge.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,is_finished'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'id': self.challenge.id, 'is_finished': False})
+        # Only the validator query of the ETag joins the answers
+        self.assertFalse(any('FROM "quiz_answer"' in q['sql'] or 'quiz_option' in q['sql']
+                             for q in queries))
+
+    def test_quiz_list_omits_questions_without_prefetching_them(self):
+        self.client.force_authenticate(user=self.creator_profile.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('quiz-list'), {'omit': 'questions,description'})
+        quiz = response.data['results'][0]
+        self.assertNotIn('questions', quiz)
+        self.assertNotIn('description', quiz)
+        self.assertEqual(quiz['number_of_questions'], 2)
+        self.assertFalse(any('quiz_quiz_questions' in q['sql'] for q in queries))
+
+    def test_challenge_list_only_reads_selected_columns(self):
+        self.create_challenge(1)
+        url = reverse('challenge-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,status', 'page_size': 1})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'status'})
+        page_query = queries[-1]['sql']
+        self.assertIn('"quiz_challenge"."is_finished"', page_query)
+        self.assertNotIn('"quiz_challenge"."running_score"', page_query)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['id'], self.challenge.id)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('challenge-list'), {'omit': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_return_every_field(self):
+        self.client.force_authenticate(user=self.creator_profile.user)
+        question = self.challenge.quiz.questions.first()
+        response = self.client.post(
+            f"{reverse('quiz-create')}?fields=id",
+            {'title': 'New', 'description': 'quiz', 'questions': [question.id]},
+            format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['number_of_questions'], 1)
+
+    def test_export_columns(self):
+        self.client.force_authenticate(user=self.creator_profile.user)
+        url = reverse('quiz-challenges', kwargs={'quiz_id': self.challenge.quiz_id})
+        response = self.client.get(url, {'format': 'csv', 'fields': 'id,is_finished'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ['id,is_finished', f'{self.challenge.id},false'])
+
+
+class RequestMetricsTest(ChallengeTestMixin, APITestCase):
+    def test_reports_queries_and_timings(self):
+        challenge = self.create_challenge(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('challenge-detail', kwargs={'pk': challenge.id}))
+        self.assertEqual(response['X-DB-Queries'], str(len(queries)))
+        timings = dict(part.split(';dur=') for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timings), {'db', 'serializer', 'total'})
+        self.assertGreater(float(timings['serializer']), 0)
+
+    def test_metrics_endpoint_renders_histograms_per_url_name(self):
+        challenge = self.create_challenge(1)
+        self.client.get(reverse('challenge-detail', kwargs={'pk': challenge.id}))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        admin = User.objects.create_user(username='admin', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = response.content.decode().splitlines()
+        self.assertIn('# TYPE http_request_db_queries histogram', lines)
+        self.assertTrue(any(line.startswith(
+            'http_request_duration_seconds_bucket{view="challenge-detail",le="+Inf"}')
+            for line in lines))
+
+
+class ProfilingTest(ChallengeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(PROFILING_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.challenge = self.create_challenge(2)
+        self.url = reverse('challenge-detail', kwargs={'pk': self.challenge.id})
+        admin = User.objects.create_user(username='admin', is_staff=True)
+        self.admin_token = Token.objects.create(user=admin)
+
+    def test_admin_header_profiles_the_request(self):
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+        response = self.client.get(reverse('quiz-content-cache-stats'),
+                                   HTTP_X_PROFILE='pstats')
+        name = response['X-Profile']
+        self.assertTrue(name.startswith('quiz-content-cache-stats-'))
+
+        profiles = self.client.get(reverse('profile-list')).json()
+        self.assertEqual([(p['name'], p['format']) for p in profiles], [(name, 'pstats')])
+        download = self.client.get(reverse('profile-download', kwargs={'name': name}))
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertIn('attachment', download['Content-Disposition'])
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        self.assertTrue(any(function == 'get' for _, _, function in stats.stats))
+
+    def test_header_is_ignored_for_other_users(self):
+        token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.get(self.url, HTTP_X_PROFILE='collapsed')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile', response)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sampled_requests_write_collapsed_stacks(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response['X-Profile'].startswith('challenge-detail-'))
+        self.assertTrue(response['X-Profile'].endswith('.collapsed'))
+
+
+class StaticSchemaViewTest(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'schema.yml')
+        with open(self.path, 'w') as schema_file:
+            schema_file.write('openapi: 3.0.3\n')
+
+    def test_serves_the_file_with_a_strong_etag(self):
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path):
+            response = self.client.get(reverse('schema'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, b'openapi: 3.0.3\n')
+            self.assertFalse(response['ETag'].startswith('W/'))
+
+            response = self.client.get(reverse('schema'),
+                                       HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_file_is_not_found(self):
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path + '.missing'):
+            response = self.client.get(reverse('schema'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Checks SQLite query plans')
+class QueryPlanTest(ChallengeTestMixin, APITestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on the querysets issued by quiz/views and fails
+    if any of them falls back to a full scan or a sort.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.challenge = self.create_challenge(2)
+        self.quiz = self.challenge.quiz
+
+    def view_queryset(self, view_class, user, **kwargs):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        view = view_class()
+        view.setup(request, **kwargs)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        return view.get_queryset()
+
+    def assertUsesIndexes(self, queryset):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, r'\bSCAN\b', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_participant_views(self):
+        user = self.user
+        pk = self.challenge.pk
+        challenges = self.view_queryset(user_views.ChallengeListView, user)
+        paginator = KeysetPagination()
+        self.assertUsesIndexes(paginator.get_page_queryset(challenges)[:21])
+        self.assertUsesIndexes(paginator.get_page_queryset(
+            challenges, (self.challenge.created_on, pk))[:21])
+        self.assertUsesIndexes(
+            self.view_queryset(common_views.ChallengeDetailView, user).filter(pk=pk))
+        self.assertUsesIndexes(
+            self.view_queryset(user_views.AcceptChallengeView, user).filter(pk=pk))
+        self.assertUsesIndexes(
+            self.view_queryset(user_views.FinishChallengeView, user).filter(pk=pk))
+        self.assertUsesIndexes(Answer.objects.filter(
+            challenge=self.challenge, question_id=1).select_related('option'))
+
+    def test_creator_views(self):
+        creator = self.creator_profile.user
+        paginator = KeysetPagination()
+        position = (self.challenge.created_on, self.challenge.pk)
+        for view_class, kwargs in [
+                (creator_views.QuestionListView, {}),
+                (creator_views.QuizListView, {}),
+                (creator_views.QuizChallengesListView, {'quiz_id': self.quiz.id})]:
+            queryset = self.view_queryset(view_class, creator, **kwargs)
+            self.assertUsesIndexes(paginator.get_page_queryset(queryset)[:21])
+            self.assertUsesIndexes(
+                paginator.get_page_queryset(queryset, position)[:21])
+        profiles = creator_views.UserProfileViewSet.queryset
+        self.assertUsesIndexes(paginator.get_page_queryset(profiles, position)[:21])
+
+    def test_leaderboard(self):
+        Challenge.objects.filter(pk=self.challenge.pk).update(
+            is_finished=True, no_of_correct_answers=1, finished_on=timezone.now())
+        self.challenge.refresh_from_db()
+        leaderboard = Challenge.objects.leaderboard(self.quiz.id)
+        self.assertUsesIndexes(leaderboard[:10])
+        self.assertUsesIndexes(ScoreCount.objects.filter(
+            quiz=self.quiz, score__gt=self.challenge.no_of_correct_answers))
+        ties_ahead = Challenge.objects.ties_ahead_of(self.challenge)
+        self.assertUsesIndexes(ties_ahead)
+        # The index range is bounded by the finish time, not every tie
+        self.assertIn('finished_on<', ties_ahead.explain())
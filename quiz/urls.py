@@ -14,6 +14,10 @@ urlpatterns = [
     path('', include(router.urls)),
     path('questions/add/', creator_views.AddQuestionView.as_view(),
          name='add-question'),
+    path('questions/bulk/', creator_views.BulkQuestionImportView.as_view(),
+         name='bulk-question-import'),
+    path('questions/edit/', creator_views.BulkEditQuestionView.as_view(),
+         name='bulk-edit-question'),
     path('questions/edit/<int:pk>/',
          creator_views.EditQuestionView.as_view(), name='edit-question'),
     path('questions/', creator_views.QuestionListView.as_view(),
@@ -23,11 +27,17 @@ urlpatterns = [
     path('challenge/assign/',
          creator_views.AssignChallengeView.as_view(),
          name='assign-challenge'),
+    path('challenge/assign/bulk/',
+         creator_views.BulkAssignChallengeView.as_view(),
+         name='bulk-assign-challenge'),
     path('quizzes/', creator_views.QuizListView.as_view(),
          name='quiz-list'),
     path('quizzes/<int:quiz_id>/challenges/',
          creator_views.QuizChallengesListView.as_view(),
          name='quiz-challenges'),
+    path('quizzes/<int:quiz_id>/analytics/',
+         creator_views.QuizAnalyticsView.as_view(),
+         name='quiz-analytics'),
 
 
     # Common URL patterns
@@ -36,6 +46,17 @@ urlpatterns = [
     path('challenges/<int:pk>/',
          common_views.ChallengeDetailView.as_view(),
          name='challenge-detail'),
+    path('quizzes/<int:quiz_id>/leaderboard/',
+         common_views.QuizLeaderboardView.as_view(),
+         name='quiz-leaderboard'),
+    path('cache/quiz-content/stats/',
+         common_views.QuizContentCacheStatsView.as_view(),
+         name='quiz-content-cache-stats'),
+    path('metrics', common_views.MetricsView.as_view(), name='metrics'),
+    path('profiles/', common_views.ProfileListView.as_view(),
+         name='profile-list'),
+    path('profiles/<str:name>/', common_views.ProfileDownloadView.as_view(),
+         name='profile-download'),
 
     # End User URL patterns
 
@@ -44,6 +65,8 @@ urlpatterns = [
          name='accept-challenge'),
     path('challenges/<int:challenge_id>/answer/',
          user_views.AnswerQuizView.as_view(), name='answer-quiz'),
+    path('challenges/<int:challenge_id>/answers/',
+         user_views.AnswerBatchView.as_view(), name='answer-quiz-batch'),
     path('challenge/<int:pk>/finish/',
          user_views.FinishChallengeView.as_view(),
          name='finish-challenge'),
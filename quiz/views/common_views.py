@@ -1,12 +1,35 @@
+import hashlib
+import os
+from functools import lru_cache
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 from rest_framework.response import Response
 from rest_framework import generics
-from quiz.models import Challenge
-from quiz.serializers import ChallengeDetailSerializer
+from quiz.models import Challenge, Quiz
+from quiz.serializers import (ChallengeDetailSerializer,
+                              LeaderboardEntrySerializer,
+                              ProfileSerializer,
+                              QuizContentCacheStatsSerializer)
+from rest_framework.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404
 from quiz.permissions import IsChallengeOwnerOrQuizCreator
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
+from quiz.cache import quiz_content_cache
+from quiz.conditional import ConditionalGetMixin
+from quiz.fieldsets import SparseFieldsetViewMixin
+from quiz.metrics import TimedSerializerMixin, registry
+from quiz.profiling import PROFILE_NAME_RE, get_profile_dir, list_profiles
+from quiz.routers import ReplicaReadMixin
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import View
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 
 
 class LoginView(ObtainAuthToken):
@@ -30,22 +53,199 @@ class LoginView(ObtainAuthToken):
         })
 
 
-class ChallengeDetailView(generics.RetrieveAPIView):
+class ChallengeDetailView(ReplicaReadMixin, ConditionalGetMixin,
+                          SparseFieldsetViewMixin, TimedSerializerMixin,
+                          generics.RetrieveAPIView):
     """
     Detail view for retrieving a single challenge instance.
+
+    Answers 304 Not Modified to a matching If-None-Match when neither the
+    challenge, its answers nor its quiz's content changed.
     """
-    queryset = Challenge.objects.all()
+    queryset = Challenge.objects.select_related(
+        'user__user', 'quiz__user__user').with_question_tree()
     serializer_class = ChallengeDetailSerializer
     permission_classes = [IsAuthenticated, IsChallengeOwnerOrQuizCreator]
 
-    def get(self, request, *args, **kwargs):
+    def get_validators(self):
+        challenge = get_object_or_404(
+            Challenge.objects.select_related(
+                'user__user', 'quiz__user__user').annotate(
+                answer_count=Count('user_answers'),
+                answers_updated_on=Max('user_answers__updated_on')),
+            pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, challenge)
+        return (challenge.updated_on, challenge.answer_count,
+                challenge.answers_updated_on, challenge.quiz.content_version)
+
+    def retrieve(self, request, *args, **kwargs):
         """
         Handle GET request to retrieve details of a specific challenge.
 
         Returns:
             Response: JSON response with serialized challenge data.
         """
-        instance = self.get_object()
-        serializer = ChallengeDetailSerializer(instance,
-                                               context={'request': request})
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
+
+
+class QuizLeaderboardView(TimedSerializerMixin, generics.GenericAPIView):
+    """
+    Ranked leaderboard of the finished challenges of a quiz.
+
+    Available to the quiz creator and its participants. Ties on the score
+    are broken by the earliest finish time.
+    """
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = [IsAuthenticated]
+    default_limit = 10
+    max_limit = 100
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request for the top entries and the caller's own rank.
+
+        Returns:
+            Response: JSON response with the top ?limit= entries and the
+            entry of the requesting participant, if they finished the quiz.
+        """
+        quiz = get_object_or_404(Quiz, id=self.kwargs['quiz_id'])
+        user_profile = request.user.user
+        own = Challenge.objects.filter(quiz=quiz, user=user_profile).first()
+        if quiz.user_id != user_profile.id and own is None:
+            raise PermissionDenied()
+
+        top = list(Challenge.objects.leaderboard(quiz.id).select_related(
+            'user__user')[:self.get_limit()])
+        for rank, challenge in enumerate(top, start=1):
+            challenge.rank = rank
+
+        me = None
+        if own is not None and own.is_finished:
+            own.rank = Challenge.objects.rank_of(own)
+            me = self.get_serializer(own).data
+        return Response({
+            'results': self.get_serializer(top, many=True).data,
+            'me': me,
+        })
+
+
+class ProfileListView(APIView):
+    """
+    Admin-only view listing the request profiles stored in this process's
+    PROFILING_DIR, newest first.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(responses=ProfileSerializer(many=True))
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to list stored profiles.
+
+        Returns:
+            Response: JSON list of profiles with their URL name, format,
+            size and creation time.
+        """
+        return Response(list_profiles())
+
+
+class ProfileDownloadView(APIView):
+    """
+    Admin-only view downloading one stored request profile.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(responses={
+        (200, 'application/octet-stream'): OpenApiTypes.BINARY})
+    def get(self, request, name, *args, **kwargs):
+        """
+        Handle GET request to download a profile by file name.
+
+        Returns:
+            FileResponse: The collapsed-stack or pstats file.
+        """
+        if not PROFILE_NAME_RE.match(name):
+            raise Http404
+        try:
+            profile_file = open(os.path.join(get_profile_dir(), name), 'rb')
+        except FileNotFoundError:
+            raise Http404
+        return FileResponse(profile_file, as_attachment=True, filename=name)
+
+
+class QuizContentCacheStatsView(APIView):
+    """
+    Admin-only view exposing the hit, miss and invalidation counters of
+    the quiz content cache in this process.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(responses=QuizContentCacheStatsSerializer)
+    def get(self, request, *args, **kwargs):
+        return Response(quiz_content_cache.stats())
+
+
+@lru_cache(maxsize=4)
+def load_schema(path, mtime_ns):
+    """
+    Read a schema file and its strong ETag, once per file modification.
+    """
+    with open(path, 'rb') as schema_file:
+        content = schema_file.read()
+    return content, quote_etag(hashlib.sha256(content).hexdigest())
+
+
+class StaticSchemaView(View):
+    """
+    Serves the OpenAPI schema generated ahead of time into
+    settings.OPENAPI_SCHEMA_FILE, instead of introspecting every view on
+    each request.
+    """
+    content_type = 'application/vnd.oai.openapi; charset=utf-8'
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request for the pre-generated OpenAPI schema.
+
+        Returns:
+            HttpResponse: The schema, or 304 if the client's ETag matches.
+        """
+        path = settings.OPENAPI_SCHEMA_FILE
+        try:
+            content, etag = load_schema(path, os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            raise Http404("The OpenAPI schema has not been generated, run "
+                          f"`manage.py spectacular --file {path}`.")
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=self.content_type)
+        response.headers['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class MetricsView(APIView):
+    """
+    Admin-only Prometheus scrape endpoint for the request metrics of this
+    process, see quiz.metrics. Scrapers authenticate with an admin token.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    @extend_schema(responses={(200, 'text/plain'): OpenApiTypes.STR})
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request for the request metrics.
+
+        Returns:
+            HttpResponse: Histograms in the Prometheus text format.
+        """
+        return HttpResponse(registry.render(), content_type=self.content_type)
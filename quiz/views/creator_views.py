@@ -1,20 +1,43 @@
-from rest_framework import viewsets, generics
-from quiz.models import UserProfile, Question, Quiz, Challenge
+import json
+from collections.abc import Iterator
+from itertools import islice
+from rest_framework import viewsets, generics, status
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from quiz.models import UserProfile, Question, Option, Quiz, Challenge
+from quiz.analytics import quiz_answer_stats
+from quiz.conditional import ConditionalGetMixin
+from quiz.fieldsets import SparseFieldsetViewMixin, select_fields
+from quiz.metrics import TimedSerializerMixin
+from quiz.pagination import KeysetPagination
+from quiz.parsers import NDJSONParser
+from quiz.renderers import CSVRenderer, NDJSONRenderer, RowStreamRenderer
+from quiz.routers import ReplicaReadMixin
+from rest_framework.serializers import as_serializer_error
 from quiz.serializers import (UserProfileSerializer, QuestionCreateSerializer,
+                              QuestionImportSerializer,
                               QuestionUpdateSerializer, QuizSerializer,
-                              ChallengeSerializer, ChallengeListSerializer)
+                              ChallengeSerializer, ChallengeListSerializer,
+                              BulkChallengeSerializer,
+                              QuizAnswerStatsSerializer)
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from quiz.permissions import (IsQuestionOwner, IsCreator, IsQuizOwner)
 from rest_framework.response import Response
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(SparseFieldsetViewMixin, TimedSerializerMixin,
+                         viewsets.ModelViewSet):
     """
     A viewset for handling CRUD operations on UserProfile model.
     """
-    queryset = UserProfile.objects.all()
+    queryset = UserProfile.objects.select_related('user')
     serializer_class = UserProfileSerializer
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         """
@@ -36,11 +59,122 @@ class AddQuestionView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated, IsCreator]
 
 
+class BulkQuestionImportView(generics.GenericAPIView):
+    """
+    API view for importing many questions at once.
+
+    Accepts a JSON array or an NDJSON stream of questions with options.
+    Valid items are inserted in chunks, one transaction per chunk; invalid
+    or duplicate items are reported by their position and skipped.
+    """
+    serializer_class = QuestionImportSerializer
+    permission_classes = [IsAuthenticated, IsCreator]
+    parser_classes = [JSONParser, NDJSONParser]
+    chunk_size = 1000
+    duplicate_error = {'question_text': [
+        'A question with this text already exists.']}
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST request to import questions in bulk.
+
+        Returns:
+            Response: JSON response with the number of created questions
+            and the errors of the rejected items.
+        """
+        data = request.data
+        if not isinstance(data, (list, Iterator)):
+            raise ParseError('Expected a list of questions.')
+        items = enumerate(data)
+        # One serializer instance validates every item, so its fields are
+        # only built once
+        serializer = self.get_serializer()
+        created = 0
+        errors = []
+        while True:
+            chunk = list(islice(items, self.chunk_size))
+            if not chunk:
+                break
+            valid = []
+            for index, item in chunk:
+                item_errors, validated = self.validate_item(serializer, item)
+                if item_errors:
+                    errors.append({'index': index, 'errors': item_errors})
+                else:
+                    valid.append((index, validated))
+            chunk_created, chunk_errors = self.import_chunk(valid)
+            created += chunk_created
+            errors.extend(chunk_errors)
+
+        errors.sort(key=lambda error: error['index'])
+        return Response({'created': created, 'errors': errors},
+                        status=status.HTTP_200_OK)
+
+    def validate_item(self, serializer, item):
+        if isinstance(item, str):
+            # NDJSON lines are decoded one at a time
+            try:
+                item = json.loads(item)
+            except ValueError as exc:
+                return {'non_field_errors': [f'Invalid JSON: {exc}']}, None
+        try:
+            return None, serializer.validate_item(item)
+        except ValidationError as exc:
+            return as_serializer_error(exc), None
+
+    def import_chunk(self, valid):
+        """
+        Insert a chunk of validated questions, skipping duplicates.
+        """
+        errors = []
+        texts = [data['question_text'] for _, data in valid]
+        existing = set(Question.objects.filter(
+            question_text__in=texts).values_list('question_text', flat=True))
+        new = []
+        for index, data in valid:
+            if data['question_text'] in existing:
+                errors.append({'index': index, 'errors': self.duplicate_error})
+            else:
+                existing.add(data['question_text'])
+                new.append((index, data))
+
+        try:
+            with transaction.atomic():
+                self.create_questions([data for _, data in new])
+        except IntegrityError:
+            # A concurrent import won a race; retry item by item
+            return self.import_one_by_one(new, errors)
+        return len(new), errors
+
+    def import_one_by_one(self, new, errors):
+        created = 0
+        for index, data in new:
+            try:
+                with transaction.atomic():
+                    self.create_questions([data])
+            except IntegrityError:
+                errors.append({'index': index, 'errors': self.duplicate_error})
+            else:
+                created += 1
+        return created, errors
+
+    def create_questions(self, questions_data):
+        user_profile = self.request.user.user
+        questions = Question.objects.bulk_create([
+            Question(created_by=user_profile,
+                     question_text=data['question_text'])
+            for data in questions_data])
+        Option.objects.bulk_create([
+            Option(question=question, **option_data)
+            for question, data in zip(questions, questions_data)
+            for option_data in data['options']])
+
+
 class EditQuestionView(generics.UpdateAPIView):
     """
     API view for updating an existing question.
     """
-    queryset = Question.objects.all()
+    queryset = Question.objects.prefetch_related('options')
     serializer_class = QuestionUpdateSerializer
     permission_classes = [IsAuthenticated, IsCreator]
     allowed_methods = ['PATCH']
@@ -66,19 +200,64 @@ class EditQuestionView(generics.UpdateAPIView):
         return []
 
 
-class QuestionListView(generics.ListAPIView):
+class BulkEditQuestionView(generics.GenericAPIView):
+    """
+    API view for updating many questions owned by the user in one request.
+    """
+    serializer_class = QuestionUpdateSerializer
+    permission_classes = [IsAuthenticated, IsCreator]
+
+    def patch(self, request, *args, **kwargs):
+        """
+        Handle PATCH request with a list of partial question updates.
+
+        Every item must include the question "id"; all changes are applied
+        in one transaction.
+        """
+        if not isinstance(request.data, list):
+            raise ParseError('Expected a list of questions.')
+        question_ids = [item.get('id') for item in request.data
+                        if isinstance(item, dict)]
+        questions = Question.objects.filter(
+            created_by=request.user.user,
+            id__in=[pk for pk in question_ids if isinstance(pk, int)]
+        ).prefetch_related('options')
+        serializer = self.get_serializer(list(questions), data=request.data,
+                                         many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+
+class QuestionListView(ReplicaReadMixin, ConditionalGetMixin,
+                       SparseFieldsetViewMixin, TimedSerializerMixin,
+                       generics.ListAPIView):
     """
     API view for listing questions created by the authenticated user.
+
+    Answers 304 Not Modified to a matching If-None-Match. ?omit=options
+    also skips loading the options.
     """
     serializer_class = QuestionUpdateSerializer
     permission_classes = [IsAuthenticated, IsCreator]
+    pagination_class = KeysetPagination
+
+    def get_validators(self):
+        # Every edit of a question or option moves its updated_on, and
+        # deleted rows change the counts
+        values = self.get_queryset().aggregate(
+            count=Count('id', distinct=True), updated_on=Max('updated_on'),
+            option_count=Count('options'),
+            options_updated_on=Max('options__updated_on'))
+        return values
 
     def get_queryset(self):
         """
         Return a queryset of questions created by the authenticated user.
         """
         user_profile = self.request.user.user
-        queryset = Question.objects.filter(created_by=user_profile)
+        queryset = Question.objects.filter(
+            created_by=user_profile).prefetch_related('options')
         return queryset
 
 
@@ -91,19 +270,32 @@ class QuizCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated, IsCreator]
 
 
-class QuizListView(generics.ListAPIView):
+class QuizListView(ReplicaReadMixin, ConditionalGetMixin,
+                   SparseFieldsetViewMixin, TimedSerializerMixin,
+                   generics.ListAPIView):
     """
     API view for listing quizzes created by the authenticated user.
+
+    Answers 304 Not Modified to a matching If-None-Match.
     """
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated, IsCreator]
+    pagination_class = KeysetPagination
+
+    def get_validators(self):
+        # Changes to the questions and counters of a quiz move its
+        # updated_on too, and deleted quizzes change the count
+        values = self.get_queryset().aggregate(
+            count=Count('id'), updated_on=Max('updated_on'))
+        return values
 
     def get_queryset(self):
         """
         Return a queryset of quizzes created by the authenticated user.
         """
-        return self.queryset.filter(user=self.request.user.user)
+        return self.queryset.filter(
+            user=self.request.user.user).prefetch_related('questions')
 
 
 class AssignChallengeView(generics.CreateAPIView):
@@ -121,9 +313,75 @@ class AssignChallengeView(generics.CreateAPIView):
         serializer.save()
 
 
-class QuizChallengesListView(generics.ListAPIView):
+class BulkAssignChallengeView(generics.GenericAPIView):
+    """
+    API view for assigning a quiz to many participants at once.
+    """
+    serializer_class = BulkChallengeSerializer
+    permission_classes = [IsAuthenticated, IsCreator]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST request to assign a quiz in bulk.
+
+        Returns:
+            Response: JSON response with the number of created challenges
+            and of participants that already had the quiz.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_201_CREATED)
+
+
+class QuizChallengesListView(SparseFieldsetViewMixin, TimedSerializerMixin,
+                             generics.ListAPIView):
+    """
+    API view for listing the challenges of a quiz owned by the
+    authenticated user.
+
+    With ?format=ndjson or ?format=csv the challenges are streamed as an
+    export straight from a database cursor, so memory use does not grow
+    with the number of challenges. ?fields= and ?omit= select the columns
+    of both.
+    """
     serializer_class = ChallengeListSerializer
     permission_classes = [IsAuthenticated, IsQuizOwner]
+    pagination_class = KeysetPagination
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        NDJSONRenderer, CSVRenderer]
+    export_chunk_size = 2000
+
+    def get_export_fields(self):
+        """
+        Return the serializer fields that are model columns, in their
+        declared order; the export reads them as plain value tuples.
+        """
+        serializer = self.get_serializer_class()()
+        columns = {field.name for field in Challenge._meta.concrete_fields}
+        return [name for name, field in serializer.fields.items()
+                if field.source in columns]
+
+    def list(self, request, *args, **kwargs):
+        """
+        Handle GET request for the challenges of a quiz.
+
+        Returns:
+            Response: JSON page of challenges, or a StreamingHttpResponse
+            with one NDJSON/CSV row per challenge of the quiz.
+        """
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, RowStreamRenderer):
+            return super().list(request, *args, **kwargs)
+
+        columns = select_fields(request.query_params, self.get_export_fields())
+        rows = self.get_queryset().order_by('id').values_list(
+            *columns).iterator(chunk_size=self.export_chunk_size)
+        response = StreamingHttpResponse(
+            renderer.stream(columns, rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        filename = f"quiz-{self.kwargs['quiz_id']}-challenges.{renderer.format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
     def get_queryset(self):
         quiz_id = self.kwargs['quiz_id']
@@ -132,3 +390,21 @@ class QuizChallengesListView(generics.ListAPIView):
         # Check if the user has permission to access this quiz
         self.check_object_permissions(self.request, quiz)
         return Challenge.objects.filter(quiz=quiz)
+
+
+class QuizAnalyticsView(TimedSerializerMixin, generics.GenericAPIView):
+    """
+    API view for the answer distribution of a quiz, served from the
+    per-option pick counters.
+    """
+    serializer_class = QuizAnswerStatsSerializer
+    permission_classes = [IsAuthenticated, IsQuizOwner]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request for option pick counts, percent correct per
+        question and the average score of the finished challenges.
+        """
+        quiz = get_object_or_404(Quiz, id=self.kwargs['quiz_id'])
+        self.check_object_permissions(request, quiz)
+        return Response(self.get_serializer(quiz_answer_stats(quiz)).data)
@@ -1,11 +1,23 @@
 from rest_framework import generics, status, serializers
 from rest_framework.permissions import IsAuthenticated
-from quiz.models import Challenge, Answer
+from quiz.models import Challenge, Answer, OptionPickCount
 from quiz.permissions import IsNotCreator
 from rest_framework.response import Response
 from quiz.serializers import (AcceptChallengeSerializer, AnswerSerializer,
+                              AnswerBatchSerializer,
                               ChallengeDetailSerializer,
+                              ChallengeSummarySerializer,
                               FinishChallengeSerializer)
+from quiz.fieldsets import SparseFieldsetViewMixin
+from quiz.metrics import TimedSerializerMixin
+from quiz.pagination import KeysetPagination
+from quiz.routers import ReplicaReadMixin
+from quiz.analytics import record_picks
+from quiz.scoring import add_to_running_score, record_finished_score
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 
@@ -48,32 +60,72 @@ class AnswerQuizView(generics.CreateAPIView):
     serializer_class = AnswerSerializer
     permission_classes = [IsAuthenticated, IsNotCreator]
 
-    def perform_create(self, serializer):
-        """
-        Perform create action for saving an answer to a quiz question.
-        """
-        challenge_id = self.kwargs.get('challenge_id')
-        challenge = Challenge.objects.get(id=challenge_id, user=self.request.user.user)
-
+    def get_challenge(self):
+        challenge = get_object_or_404(Challenge.objects.select_related('quiz'),
+                                      id=self.kwargs.get('challenge_id'),
+                                      user=self.request.user.user)
         if challenge.is_finished:
             raise serializers.ValidationError("This challenge has already been finished.")
         if not challenge.is_accepted:
             raise serializers.ValidationError("This challenge has not been accepted.")
+        return challenge
 
-        # Get the option and related question
-        option = serializer.validated_data['option']
-        question = option.question
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['challenge'] = getattr(self, 'challenge', None)
+        return context
 
-        # Check for an existing answer for the same question in the challenge
-        existing_answer = Answer.objects.filter(challenge=challenge, option__question=question).first()
+    def create(self, request, *args, **kwargs):
+        """
+        Handle POST request to answer a question of the challenge in the
+        URL; the option is validated against that challenge's quiz.
+        """
+        self.challenge = self.get_challenge()
+        return super().create(request, *args, **kwargs)
 
-        if existing_answer:
-            # Update the existing answer
-            existing_answer.option = option
-            existing_answer.save()
-        else:
-            # Create a new answer if no existing answer is found
-            serializer.save(challenge=challenge)
+    def perform_create(self, serializer):
+        """
+        Perform create action for saving an answer to a quiz question.
+        """
+        challenge = self.challenge
+        option_id = serializer.validated_data['option_id']
+        question_id = serializer.validated_data['question_id']
+
+        previous = Answer.objects.filter(challenge=OuterRef('pk'),
+                                         question_id=question_id)
+        with transaction.atomic():
+            # Lock the challenge so concurrent answers to it are serialized,
+            # reading the previous answer to the question and whether the
+            # option already has a pick counter in the same statement
+            previous_option_id, previous_correct, counted = (
+                Challenge.objects.select_for_update().filter(
+                    pk=challenge.pk).annotate(
+                    previous_option_id=Subquery(previous.values('option_id')),
+                    previous_correct=Subquery(
+                        previous.values('option__is_correct')),
+                    counted=Exists(OptionPickCount.objects.filter(
+                        quiz_id=challenge.quiz_id, option_id=option_id))
+                ).values_list('previous_option_id', 'previous_correct',
+                              'counted').get())
+
+            # Insert the answer or replace the option of the existing one
+            # with a single INSERT ... ON CONFLICT DO UPDATE
+            answer = Answer(challenge=challenge, option_id=option_id,
+                            question_id=question_id)
+            Answer.objects.bulk_create(
+                [answer], update_conflicts=True,
+                unique_fields=['challenge', 'question'],
+                update_fields=['option', 'updated_on'])
+            serializer.instance = answer
+
+            if previous_option_id == option_id:
+                return
+            add_to_running_score(challenge.id,
+                                 serializer.validated_data['is_correct']
+                                 - bool(previous_correct))
+            record_picks(challenge.quiz_id, [option_id],
+                         [previous_option_id] if previous_option_id else [],
+                         create_counters=not counted)
 
     def get_queryset(self):
         """
@@ -82,19 +134,67 @@ class AnswerQuizView(generics.CreateAPIView):
         return Answer.objects.filter(challenge__user=self.request.user.user)
 
 
-class ChallengeListView(generics.ListAPIView):
+class AnswerBatchView(generics.GenericAPIView):
+    """
+    API view for answering several questions of a challenge at once.
+    """
+    serializer_class = AnswerBatchSerializer
+    permission_classes = [IsAuthenticated, IsNotCreator]
+
+    def get_challenge(self):
+        challenge = get_object_or_404(Challenge.objects.select_related('quiz'),
+                                      id=self.kwargs.get('challenge_id'),
+                                      user=self.request.user.user)
+        if challenge.is_finished:
+            raise serializers.ValidationError("This challenge has already been finished.")
+        if not challenge.is_accepted:
+            raise serializers.ValidationError("This challenge has not been accepted.")
+        return challenge
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST request with a list of option ids to answer.
+
+        Returns:
+            Response: JSON response with the result for every question.
+        """
+        context = self.get_serializer_context()
+        context['challenge'] = self.get_challenge()
+        serializer = self.get_serializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        return Response({'answers': serializer.save()},
+                        status=status.HTTP_200_OK)
+
+
+class ChallengeListView(ReplicaReadMixin, SparseFieldsetViewMixin,
+                        TimedSerializerMixin, generics.ListAPIView):
     """
     API view for listing challenges created by the authenticated user.
+
+    Challenges are returned as compact summaries; pass ?expand=questions
+    to include the full question tree of every challenge in the page.
     """
     queryset = Challenge.objects.all()
-    serializer_class = ChallengeDetailSerializer
+    serializer_class = ChallengeSummarySerializer
     permission_classes = [IsAuthenticated, IsNotCreator]
+    pagination_class = KeysetPagination
+
+    def expand_questions(self):
+        return 'questions' in self.request.query_params.get('expand', '').split(',')
 
     def get_queryset(self):
         """
         Return challenges created by the authenticated user.
         """
-        return self.queryset.filter(user=self.request.user.user)
+        queryset = self.queryset.filter(user=self.request.user.user)
+        if self.expand_questions():
+            return queryset.with_question_tree()
+        return queryset.select_related('quiz')
+
+    def get_serializer_class(self):
+        if self.expand_questions():
+            return ChallengeDetailSerializer
+        return ChallengeSummarySerializer
 
 
 class FinishChallengeView(generics.UpdateAPIView):
@@ -117,19 +217,18 @@ class FinishChallengeView(generics.UpdateAPIView):
         """
         Handle PATCH request to finish a challenge.
         """
-        instance = self.get_object()
-        if instance.user != request.user.user:
-            return Response({"detail":
-                             "Not authorized to finish this challenge."},
-                            status=status.HTTP_403_FORBIDDEN)
-
-        correct_answers = Answer.objects.filter(
-            challenge=instance,
-            option__is_correct=True
-        ).count()
-        instance.is_finished = True
-        instance.finished_on = timezone.now()
-        instance.no_of_correct_answers = correct_answers
-        instance.save()
+        # The score is kept up to date as answers come in, so finishing is
+        # a single conditional UPDATE
+        now = timezone.now()
+        with transaction.atomic():
+            finished = self.get_queryset().filter(pk=kwargs['pk']).update(
+                is_finished=True, finished_on=now, updated_on=now,
+                no_of_correct_answers=F('running_score'))
+            if not finished:
+                raise Http404
+            quiz_id, score = Challenge.objects.filter(
+                pk=kwargs['pk']).values_list(
+                'quiz_id', 'no_of_correct_answers').get()
+            record_finished_score(quiz_id, score)
         return Response({"detail": "Challenge finished successfully"},
                         status=status.HTTP_200_OK)
@@ -3,5 +3,6 @@
 python manage.py migrate
 python manage.py test quiz
 python manage.py collectstatic --noinput
+python manage.py spectacular --file openapi-schema.yml
 python manage.py createsuperuser --noinput
 python manage.py runserver 0.0.0.0:8000